@@ -0,0 +1,145 @@
+"""Chunked loading of the AQI data set.
+
+The analysis script originally read the whole CSV with a single
+``pd.read_csv`` call and then copied it before imputing.  For multi-year,
+per-hour station feeds that doubles peak memory, so the helpers below read
+the file in chunks with compact dtypes and run the median-imputation,
+column-drop and scaling stages one chunk at a time.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from imputation import MedianImputer
+from stats_kernel import MomentAccumulator
+
+AQI_CSV_PATH = "AQI Data Set.csv"
+ID_COLUMN = "Id"
+PERIOD_COLUMN = "Mounths"
+STATION_COLUMN = "Station"
+TARGET_COLUMN = "PM10 in æg/m3"
+DROP_COLUMNS = ["Id", "Mounths", "O3   in æg/m3", "AQI"]
+NUMERIC_COLUMNS = [
+    "PM10 in æg/m3", "SO2 in æg/m3", "NOx  in æg/m3", " PM2.5  in æg/m3",
+    "Ammonia - NH3  in æg/m3", "O3   in æg/m3", "CO  in mg/m3", " Benzene  in æg/m3", "AQI",
+]
+DEFAULT_CHUNKSIZE = 100_000
+DTYPE_SAMPLE_ROWS = 1000
+
+
+def file_digest(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def aqi_dtypes(path=AQI_CSV_PATH, sample_rows=DTYPE_SAMPLE_ROWS):
+    """Return the compact dtype mapping used for every column of ``path``.
+
+    The pollutant readings and the AQI are stored as float32, the
+    identifier as int64 and the ``Mounths`` column is left to
+    :func:`parse_periods`.  Any other column is float32 when its first
+    ``sample_rows`` values are numeric and read as strings otherwise, so
+    text columns such as a city or station name are kept as they are.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows)
+    dtypes = {}
+    for col in sample.columns:
+        if col == ID_COLUMN:
+            dtypes[col] = "int64"
+        elif col in (PERIOD_COLUMN, STATION_COLUMN):
+            dtypes[col] = "str"
+        elif col in NUMERIC_COLUMNS or (pd.api.types.is_numeric_dtype(sample[col])
+                                        and not pd.api.types.is_bool_dtype(sample[col])):
+            dtypes[col] = "float32"
+        else:
+            dtypes[col] = "str"
+    return dtypes
+
+
+def parse_periods(values):
+    """Convert ``Mounths`` labels such as ``Jan-17`` to monthly periods."""
+    return pd.to_datetime(values, format="%b-%y").dt.to_period("M")
+
+
+def read_aqi_chunks(path=AQI_CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield the AQI file as DataFrames of at most ``chunksize`` rows."""
+    dtypes = aqi_dtypes(path)
+    with pd.read_csv(path, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            if PERIOD_COLUMN in chunk.columns:
+                chunk[PERIOD_COLUMN] = parse_periods(chunk[PERIOD_COLUMN])
+            yield chunk
+
+
+def load_aqi(path=AQI_CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Load the whole AQI file with compact dtypes."""
+    return pd.concat(read_aqi_chunks(path, chunksize), ignore_index=True)
+
+
+def compute_medians(path=AQI_CSV_PATH, chunksize=DEFAULT_CHUNKSIZE, method="sketch"):
+    """Return the median of every numeric column of ``path``.
+
+    See :class:`imputation.MedianImputer` for the available ``method`` values;
+    the default sketch keeps memory bounded regardless of the file size.
+    """
+    imputer = MedianImputer(method=method)
+    return imputer.fit(read_aqi_chunks(path, chunksize)).medians_
+
+
+def clean_chunk(chunk, medians, drop_columns=DROP_COLUMNS):
+    """Fill missing values with ``medians`` and drop ``drop_columns``."""
+    chunk = chunk.fillna(medians[medians.index.isin(chunk.columns)].to_dict())
+    return chunk.drop(columns=drop_columns, errors="ignore")
+
+
+def stream_cleaned_chunks(path=AQI_CSV_PATH, medians=None, drop_columns=DROP_COLUMNS,
+                          chunksize=DEFAULT_CHUNKSIZE):
+    """Yield imputed chunks of ``path`` with ``drop_columns`` removed."""
+    if medians is None:
+        medians = compute_medians(path, chunksize)
+    for chunk in read_aqi_chunks(path, chunksize):
+        yield clean_chunk(chunk, medians, drop_columns)
+
+
+def stream_statistics(path=AQI_CSV_PATH, drop_columns=DROP_COLUMNS,
+                      chunksize=DEFAULT_CHUNKSIZE, method="sketch"):
+    """Return ``(medians, moments)`` of the cleaned data from one pass over ``path``.
+
+    The median sketch and the moments of the raw values and their missing
+    mask are updated from the same chunk; the moments of the imputed data,
+    which give the scaler, correlation and VIFs, are derived at the end.
+    """
+    imputer = MedianImputer(method=method)
+    moments = MomentAccumulator(track_missing=True)
+    for chunk in read_aqi_chunks(path, chunksize):
+        chunk = chunk.drop(columns=drop_columns, errors="ignore").select_dtypes(include=np.number)
+        imputer.partial_fit(chunk)
+        moments.update(chunk)
+    medians = imputer.medians_
+    return medians, moments.imputed(medians)
+
+
+def stream_scaled_chunks(path=AQI_CSV_PATH, drop_columns=DROP_COLUMNS,
+                         chunksize=DEFAULT_CHUNKSIZE, columns=None, statistics=None):
+    """Return ``(scaler, chunks)`` for the cleaned AQI data.
+
+    ``chunks`` is a generator of standardized float32 blocks of ``columns``
+    (default: every cleaned column) that reads the file once more, holding
+    at most one chunk of rows in memory at a time.  The scaler is fitted
+    from ``statistics``, the ``(medians, moments)`` of
+    :func:`stream_statistics`, which take one extra pass when not given.
+    """
+    if statistics is None:
+        statistics = stream_statistics(path, drop_columns, chunksize)
+    medians, moments = statistics
+    scaler = moments.to_scaler(columns)
+    columns = list(scaler.feature_names_in_)
+    chunks = (scaler.transform(chunk[columns]).astype(np.float32)
+              for chunk in stream_cleaned_chunks(path, medians, drop_columns, chunksize))
+    return scaler, chunks
@@ -0,0 +1,267 @@
+"""Per-station batch runs of the AQI analysis.
+
+The input files are partitioned by monitoring station (a ``Station``
+column, or one station per file named after the file when the column is
+absent) and optionally by time window of ``Mounths``.  The files are read
+in chunks and the rows of every partition are spilled to their own CSV,
+so rows of one station spread over several files form one partition and
+memory stays bounded by a chunk.  Every partition then goes through the
+same cleaning -> VIF elimination -> scaling/PCA -> regression pipeline as
+the analysis script, in a process pool, and the results are written as
+three tables: ``metrics.csv``, ``vifs.csv`` and ``coefficients.csv``.  A
+partition whose data and configuration hash is unchanged since the last
+run is skipped and its previous results are reused.  A partition that
+fails is reported in ``errors.csv`` without stopping the others.
+
+Usage::
+
+    python batch_runner.py station_*.csv --out results --window Y --jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from aqi_io import (DEFAULT_CHUNKSIZE, DROP_COLUMNS, PERIOD_COLUMN, STATION_COLUMN,
+                    TARGET_COLUMN, aqi_dtypes, load_aqi, parse_periods)
+from evaluation import cross_val_scores
+from imputation import MedianImputer
+from model_artifact import fold_chain
+from pca_backend import fit_pca
+from ridge_path import ridge_path
+from stats_kernel import MomentAccumulator
+from vif import VIFEngine
+
+RESULTS_DIR = "results"
+STATE_NAME = "partitions.json"
+ERRORS_NAME = "errors.csv"
+TABLES = ("metrics", "vifs", "coefficients")
+MIN_PARTITION_ROWS = 20
+DEFAULT_CONFIG = {
+    "vif_threshold": 10.0,
+    "pca_n_components": 0.95,
+    "test_size": 0.2,
+    "random_state": 42,
+    "cv": 5,
+}
+
+BatchResult = namedtuple("BatchResult", ["run", "skipped", "too_small", "failed"])
+
+
+def _partition_name(key):
+    # The hash keeps keys that sanitize alike ("A/B" and "A_B") apart
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^\w.-]+", "_", key) + f"-{digest}"
+
+
+def spill_partitions(paths, spill_dir, station_column=STATION_COLUMN, window=None,
+                     chunksize=DEFAULT_CHUNKSIZE):
+    """Split ``paths`` into one CSV per partition under ``spill_dir``.
+
+    ``window`` is a pandas period frequency such as ``"Y"`` or ``"Q"``
+    applied to the ``Mounths`` column.  Returns ``{key: (path, n_rows,
+    row_hash)}``, where ``row_hash`` is a running SHA-256 of the
+    partition's rows in file order.
+    """
+    partitions = {}
+    for path in paths:
+        file_station = os.path.splitext(os.path.basename(path))[0]
+        with pd.read_csv(path, dtype=aqi_dtypes(path), chunksize=chunksize) as reader:
+            for chunk in reader:
+                if station_column in chunk.columns:
+                    keys = chunk[station_column].astype(str)
+                else:
+                    keys = pd.Series(file_station, index=chunk.index)
+                if window is not None:
+                    periods = parse_periods(chunk[PERIOD_COLUMN]).dt.asfreq(window).astype(str)
+                    keys = keys + "/" + periods
+                for key, rows in chunk.groupby(keys, sort=False):
+                    rows = rows.drop(columns=[station_column], errors="ignore")
+                    if key not in partitions:
+                        spill_path = os.path.join(spill_dir, f"{_partition_name(key)}.csv")
+                        partitions[key] = (spill_path, 0, hashlib.sha256())
+                    spill_path, n_rows, row_hash = partitions[key]
+                    rows.to_csv(spill_path, mode="a", header=n_rows == 0, index=False)
+                    row_hash.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+                    partitions[key] = (spill_path, n_rows + len(rows), row_hash)
+    return partitions
+
+
+def partition_digest(row_hash, config):
+    """Return the hash of a partition's rows (from :func:`spill_partitions`) and the config."""
+    digest = row_hash.copy()
+    digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analyse_partition(key, frame, config=DEFAULT_CONFIG):
+    """Run the analysis pipeline on one partition and return its result tables."""
+    features = frame.drop(columns=DROP_COLUMNS, errors="ignore").select_dtypes(include=np.number)
+    # A sensor missing for the whole partition has no median to impute with
+    empty = [col for col in features.columns if features[col].isna().all()]
+    if TARGET_COLUMN in empty:
+        raise ValueError(f"Target column {TARGET_COLUMN!r} has no readings")
+    features = features.drop(columns=empty)
+    features = MedianImputer(method="exact").fit(features).transform(features)
+
+    moments = MomentAccumulator.from_frame(features)
+    elimination = VIFEngine.from_correlation(moments.correlation()).eliminate(
+        threshold=config["vif_threshold"], keep=[TARGET_COLUMN])
+    kept = elimination.kept
+    # Kept features report their final VIF, dropped ones the VIF they were dropped at
+    vifs = pd.DataFrame({
+        "partition": key,
+        "feature": list(features.columns),
+        "VIF": [elimination.trajectory[col].dropna().iloc[-1] for col in features.columns],
+        "dropped": [col not in kept for col in features.columns],
+    })
+    if empty:
+        vifs = pd.concat([vifs, pd.DataFrame({"partition": key, "feature": empty,
+                                              "VIF": np.nan, "dropped": True})],
+                         ignore_index=True)
+
+    scaler = moments.to_scaler(kept)
+    data_scaled = scaler.transform(features[kept])
+    pca = fit_pca(data_scaled, n_components=config["pca_n_components"])
+    data_pca = pca.transform(data_scaled)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data_pca, features[TARGET_COLUMN].to_numpy(dtype=np.float64),
+        test_size=config["test_size"], random_state=config["random_state"])
+
+    alpha = ridge_path(X_train, y_train).best_alpha
+    models = {"linear": LinearRegression().fit(X_train, y_train),
+              "ridge": Ridge(alpha=alpha).fit(X_train, y_train)}
+    cv_scores = cross_val_scores(models, X_train, y_train, cv=config["cv"], n_jobs=1)
+
+    metrics = []
+    coefficients = []
+    for name, model in models.items():
+        y_pred = model.predict(X_test)
+        metrics.append({
+            "partition": key, "model": name, "n_rows": len(frame),
+            "n_components": int(pca.n_components_),
+            "alpha": alpha if name == "ridge" else 0.0,
+            "r2": r2_score(y_test, y_pred),
+            "mse": mean_squared_error(y_test, y_pred),
+            "cv_mean": cv_scores[name].mean(),
+        })
+        # Coefficients on the raw features, with scaling and PCA folded in
+        weights, intercept = fold_chain(scaler.mean_, scaler.scale_, pca.mean_, pca.components_,
+                                        model.coef_, model.intercept_)
+        for feature, weight in zip(["intercept"] + kept, [intercept, *weights]):
+            coefficients.append({"partition": key, "model": name,
+                                 "feature": feature, "coefficient": weight})
+    return {"metrics": pd.DataFrame(metrics), "vifs": vifs,
+            "coefficients": pd.DataFrame(coefficients)}
+
+
+def _partition_dir(out_dir, key):
+    return os.path.join(out_dir, "partitions", _partition_name(key))
+
+
+def _run_and_save(key, spill_path, config, out_dir):
+    results = analyse_partition(key, load_aqi(spill_path), config)
+    path = _partition_dir(out_dir, key)
+    os.makedirs(path, exist_ok=True)
+    for name, table in results.items():
+        table.to_csv(os.path.join(path, f"{name}.csv"), index=False)
+    return key
+
+
+def run_batch(paths, out_dir=RESULTS_DIR, station_column=STATION_COLUMN, window=None,
+              n_jobs=None, config=DEFAULT_CONFIG, chunksize=DEFAULT_CHUNKSIZE):
+    """Analyse every changed partition of ``paths`` and rebuild the result tables.
+
+    Returns a ``BatchResult`` of the partition keys that were analysed,
+    those reused from a previous run, those left out for having fewer than
+    ``MIN_PARTITION_ROWS`` rows, and a ``{key: error}`` dict of partitions
+    that failed.  Failed partitions are left out of the tables and of the
+    saved state, so they are retried on the next run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, STATE_NAME)
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+
+    spill_dir = tempfile.mkdtemp(dir=out_dir)
+    try:
+        partitions = spill_partitions(paths, spill_dir, station_column, window, chunksize)
+        digests = {}
+        too_small = []
+        skipped = []
+        futures = {}
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            for key in sorted(partitions):
+                spill_path, n_rows, row_hash = partitions[key]
+                if n_rows < MIN_PARTITION_ROWS:
+                    too_small.append(key)
+                    continue
+                digests[key] = partition_digest(row_hash, config)
+                done = all(os.path.exists(os.path.join(_partition_dir(out_dir, key), f"{name}.csv"))
+                           for name in TABLES)
+                if done and state.get(key) == digests[key]:
+                    skipped.append(key)
+                else:
+                    futures[key] = pool.submit(_run_and_save, key, spill_path, config, out_dir)
+            run = []
+            failed = {}
+            for key, future in futures.items():
+                try:
+                    run.append(future.result())
+                except Exception as exc:
+                    failed[key] = f"{type(exc).__name__}: {exc}"
+                    del digests[key]
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    for name in TABLES:
+        tables = [pd.read_csv(os.path.join(_partition_dir(out_dir, key), f"{name}.csv"))
+                  for key in sorted(digests)]
+        table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+        table.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+    errors = pd.DataFrame({"partition": list(failed), "error": list(failed.values())})
+    errors.to_csv(os.path.join(out_dir, ERRORS_NAME), index=False)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(digests, f, indent=2, ensure_ascii=False)
+    return BatchResult(run, skipped, too_small, failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AQI analysis for every station partition.")
+    parser.add_argument("paths", nargs="+", help="AQI CSV files")
+    parser.add_argument("--out", default=RESULTS_DIR, help="output directory")
+    parser.add_argument("--station-column", default=STATION_COLUMN)
+    parser.add_argument("--window", help="pandas period frequency for time windows, e.g. Y or Q")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--vif-threshold", type=float, default=DEFAULT_CONFIG["vif_threshold"])
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows read per chunk while partitioning")
+    args = parser.parse_args(argv)
+
+    config = dict(DEFAULT_CONFIG, vif_threshold=args.vif_threshold)
+    result = run_batch(args.paths, args.out, args.station_column, args.window,
+                       args.jobs, config, args.chunksize)
+    print(f"Analysed {len(result.run)} partitions, skipped {len(result.skipped)} unchanged, "
+          f"{len(result.too_small)} too small, {len(result.failed)} failed")
+    if result.too_small:
+        print(f"Fewer than {MIN_PARTITION_ROWS} rows: {', '.join(result.too_small)}")
+    for key, error in result.failed.items():
+        print(f"Failed {key}: {error}")
+
+
+if __name__ == "__main__":
+    main()
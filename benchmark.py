@@ -0,0 +1,310 @@
+"""Benchmarks for every stage of the AQI pipeline.
+
+Synthetic data sets follow the schema of ``AQI Data Set.csv`` (the same
+header strings, BOM and ``Mounths`` labels, the eight pollutant channels
+with realistic levels and correlations, a few missing readings and an AQI
+column).  Wider sets add correlated derived channels, such as lagged or
+engineered features, next to the eight base pollutants.  Each stage is
+timed and its peak NumPy/Python heap allocation is measured with
+``tracemalloc``; the process peak RSS is recorded as well.  Results are
+written as JSON so runs of different versions can be compared.
+
+Cases whose in-memory pipeline would exceed ``--memory-budget`` run the
+chunked stages only (a streaming read, :func:`aqi_io.stream_statistics`,
+VIF and :func:`pca_backend.fit_pca_chunks`), and the in-memory stages are
+recorded as skipped.
+
+Usage::
+
+    python benchmark.py --rows 1000 100000 --columns 8 100 --output bench.json
+    python benchmark.py --full --output bench.json          # 1e3..1e7 rows, 8..500 columns
+    python benchmark.py --compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import train_test_split
+
+from aqi_io import (DROP_COLUMNS, TARGET_COLUMN, load_aqi, read_aqi_chunks, stream_scaled_chunks,
+                    stream_statistics)
+from evaluation import cross_val_scores, fit_models
+from imputation import MedianImputer
+from pca_backend import fit_pca, fit_pca_chunks
+from ridge_path import ridge_path
+from stats_kernel import MomentAccumulator
+from vif import VIFEngine
+
+# Mean and standard deviation of the pollutant channels in AQI Data Set.csv
+POLLUTANTS = {
+    "PM10 in æg/m3": (128.0, 30.0),
+    "SO2 in æg/m3": (14.0, 7.0),
+    "NOx  in æg/m3": (30.0, 5.0),
+    " PM2.5  in æg/m3": (52.0, 18.0),
+    "Ammonia - NH3  in æg/m3": (21.0, 6.0),
+    "O3   in æg/m3": (26.0, 11.0),
+    "CO  in mg/m3": (0.5, 0.2),
+    " Benzene  in æg/m3": (0.3, 0.3),
+}
+MISSING_RATE = 0.02
+DEFAULT_ROWS = [1_000, 10_000, 100_000]
+DEFAULT_COLUMNS = [8, 50]
+FULL_ROWS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+FULL_COLUMNS = [8, 50, 100, 500]
+WRITE_CHUNK_ROWS = 100_000
+# Rough bytes per cell held by the in-memory stages: the float32 frame, the
+# float64 copy for the exact medians, the imputed copy and the scaled data
+IN_MEMORY_BYTES_PER_CELL = 32
+IN_MEMORY_STAGES = ("load", "impute_exact", "impute_sketch", "clean", "moments", "correlation",
+                    "scale", "pca", "ridge_path", "fit", "cross_val")
+
+
+def synthetic_chunk(start, rows, columns, rng):
+    """Return rows ``start .. start + rows`` of a synthetic AQI data set."""
+    names = list(POLLUTANTS)
+    latent = rng.normal(size=(rows, 3))
+    data = {"Id": np.arange(start + 1, start + rows + 1),
+            "Mounths": pd.period_range("2017-01", periods=72, freq="M")
+            [(np.arange(start, start + rows) // 24) % 72].strftime("%b-%y")}
+    # Drawn from fixed seeds so every chunk, and every data set size, shares one distribution
+    loadings = np.random.default_rng(0).normal(scale=0.6, size=(len(names), 3))
+    mixes = np.random.default_rng(1).uniform(0.7, 1.0, size=max(columns - len(names), 0))
+    base = {}
+    for j, name in enumerate(names):
+        mean, std = POLLUTANTS[name]
+        z = latent @ loadings[j] + rng.normal(scale=0.6, size=rows)
+        base[name] = np.abs(mean + std * z / np.sqrt(1 + loadings[j] @ loadings[j]))
+    for k in range(columns - len(names)):
+        # Extra channels derived from a base pollutant, as lagged or engineered features would be
+        source = names[k % len(names)]
+        mix = mixes[k]
+        noise = rng.normal(scale=POLLUTANTS[source][1], size=rows)
+        base[f"{source.strip()} #{k // len(names) + 1}"] = np.abs(mix * base[source] + (1 - mix) * noise)
+    for name, values in base.items():
+        values = values.astype(np.float32)
+        values[rng.random(rows) < MISSING_RATE] = np.nan
+        data[name] = values
+    data["AQI"] = (0.7 * base[names[0]] + 0.5 * base[names[3]] + rng.normal(scale=5, size=rows)).astype(np.float32)
+    return pd.DataFrame(data)
+
+
+def write_synthetic_csv(path, rows, columns, seed=0):
+    """Write a synthetic AQI CSV of ``rows`` rows and ``columns`` pollutant channels."""
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for start in range(0, rows, WRITE_CHUNK_ROWS):
+            chunk = synthetic_chunk(start, min(WRITE_CHUNK_ROWS, rows - start), columns, rng)
+            chunk.to_csv(f, header=start == 0, index=False)
+    return path
+
+
+class StageTimer:
+    """Collect wall time and peak memory of named pipeline stages."""
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.records.append(dict(self.labels, stage=name, seconds=seconds, peak_bytes=peak,
+                                     max_rss_bytes=_max_rss_bytes()))
+
+
+def _max_rss_bytes():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def default_memory_budget():
+    """Return half of the physical memory, in bytes."""
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+
+
+def estimated_memory(rows, columns):
+    """Return the rough peak bytes of the in-memory stages for this case."""
+    return rows * (columns + 3) * IN_MEMORY_BYTES_PER_CELL
+
+
+def run_case(path, rows, columns, n_jobs=1):
+    """Run every pipeline stage on the CSV at ``path`` and return the records."""
+    timer = StageTimer(rows=rows, columns=columns, mode="in_memory")
+    with timer.stage("load"):
+        frame = load_aqi(path)
+    with timer.stage("impute_exact"):
+        medians = MedianImputer(method="exact").fit(frame).medians_
+    with timer.stage("impute_sketch"):
+        MedianImputer(method="sketch").fit(frame).medians_
+    with timer.stage("clean"):
+        df = frame.fillna(medians.to_dict()).drop(columns=DROP_COLUMNS)
+    del frame
+    with timer.stage("stream_statistics"):
+        stream_statistics(path)
+    with timer.stage("moments"):
+        moments = MomentAccumulator.from_frame(df)
+    with timer.stage("correlation"):
+        moments.correlation()
+    with timer.stage("vif"):
+        engine = VIFEngine.from_correlation(moments.correlation())
+        engine.vif()
+    with timer.stage("vif_elimination"):
+        kept = engine.eliminate(keep=[TARGET_COLUMN]).kept
+    with timer.stage("scale"):
+        data_scaled = moments.to_scaler(kept).transform(df[kept])
+    with timer.stage("pca"):
+        data_pca = fit_pca(data_scaled, n_components=0.95).transform(data_scaled)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data_pca, df[TARGET_COLUMN].to_numpy(), test_size=0.2, random_state=42)
+    with timer.stage("ridge_path"):
+        alpha = ridge_path(X_train, y_train).best_alpha
+    models = {"linear": LinearRegression(), "ridge": Ridge(alpha=alpha)}
+    with timer.stage("fit"):
+        fit_models(models, X_train, y_train, n_jobs=n_jobs)
+    with timer.stage("cross_val"):
+        cross_val_scores(models, X_train, y_train, cv=5, n_jobs=n_jobs)
+    return timer.records
+
+
+def run_streaming_case(path, rows, columns, reason):
+    """Run the chunked stages on the CSV at ``path`` and return the records.
+
+    The in-memory stages are recorded as skipped with ``reason``.
+    """
+    timer = StageTimer(rows=rows, columns=columns, mode="streaming")
+    with timer.stage("stream_load"):
+        for _ in read_aqi_chunks(path):
+            pass
+    with timer.stage("stream_statistics"):
+        medians, moments = stream_statistics(path)
+    with timer.stage("vif"):
+        engine = VIFEngine.from_correlation(moments.correlation())
+        engine.vif()
+    with timer.stage("vif_elimination"):
+        kept = engine.eliminate(keep=[TARGET_COLUMN]).kept
+    with timer.stage("stream_pca"):
+        _, chunks = stream_scaled_chunks(path, columns=kept, statistics=(medians, moments))
+        fit_pca_chunks(chunks)
+    skipped = [dict(timer.labels, stage=name, skipped=reason) for name in IN_MEMORY_STAGES]
+    return timer.records + skipped
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(rows_grid, columns_grid, data_dir=None, n_jobs=1, memory_budget=None):
+    """Benchmark every (rows, columns) combination and return the JSON document.
+
+    Cases estimated to need more than ``memory_budget`` bytes (default:
+    half of the physical memory) run the streaming stages only.
+    """
+    if memory_budget is None:
+        memory_budget = default_memory_budget()
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in rows_grid:
+            for columns in columns_grid:
+                path = os.path.join(data_dir, f"aqi_{rows}x{columns}.csv")
+                if not os.path.exists(path):
+                    write_synthetic_csv(path, rows, columns)
+                needed = estimated_memory(rows, columns)
+                if needed > memory_budget:
+                    reason = (f"estimated {needed / 2**30:.2f} GiB over the "
+                              f"{memory_budget / 2**30:.2f} GiB memory budget")
+                    records.extend(run_streaming_case(path, rows, columns, reason))
+                else:
+                    records.extend(run_case(path, rows, columns, n_jobs))
+                print(f"{rows} rows x {columns} columns done", file=sys.stderr)
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "n_jobs": n_jobs,
+            "memory_budget_bytes": memory_budget,
+        },
+        "results": records,
+    }
+
+
+def compare(old_path, new_path):
+    """Return a table of per-stage time and memory ratios between two result files."""
+    frames = []
+    for path in (old_path, new_path):
+        with open(path, encoding="utf-8") as f:
+            results = pd.DataFrame(json.load(f)["results"])
+        # In-memory and streaming runs of one shape share stage names but are not comparable
+        frames.append(results.set_index(["rows", "columns", "mode", "stage"]))
+    old, new = frames
+    # Stages skipped for the memory budget have no timings and drop out below
+    table = pd.DataFrame({
+        "old_seconds": old["seconds"], "new_seconds": new["seconds"],
+        "time_ratio": new["seconds"] / old["seconds"],
+        "memory_ratio": new["peak_bytes"] / old["peak_bytes"],
+    }).dropna()
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AQI pipeline stages.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--columns", type=int, nargs="+", default=DEFAULT_COLUMNS,
+                        help="number of pollutant channels (at least 8)")
+    parser.add_argument("--full", action="store_true", help="run the full 1e3..1e7 x 8..500 grid")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--data-dir", help="keep the generated CSV files here")
+    parser.add_argument("--memory-budget", type=float,
+                        help="GiB available to the in-memory stages (default: half of RAM)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print(compare(*args.compare).to_string(float_format="{:.3f}".format))
+        return
+    rows_grid = FULL_ROWS if args.full else args.rows
+    columns_grid = FULL_COLUMNS if args.full else args.columns
+    if min(columns_grid) < len(POLLUTANTS):
+        parser.error(f"--columns must be at least {len(POLLUTANTS)}")
+    budget = None if args.memory_budget is None else int(args.memory_budget * 2**30)
+    document = run_benchmarks(rows_grid, columns_grid, args.data_dir, args.jobs, budget)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"Wrote {len(document['results'])} stage results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Columnar on-disk cache of the cleaned AQI data.
+
+Parsing ``AQI Data Set.csv``, imputing the medians and dropping the unused
+columns is repeated on every run.  ``save_cleaned`` stores the cleaned
+frame as one column-major float32 ``.npy`` array, so every column is a
+contiguous block on disk, plus a JSON manifest with the column names,
+medians and the columns kept after VIF elimination.  ``load_cleaned``
+memory-maps the array and wraps it, and the kept columns, in DataFrames
+without copying.
+
+An entry is keyed by the source path and the cleaning configuration, and
+is only used while the source file is unchanged: same size and mtime, or,
+when only the mtime moved, the same SHA-256 digest.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from aqi_io import file_digest
+
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR = ".aqi_cache"
+MANIFEST_NAME = "manifest.json"
+VALUES_NAME = "values.npy"
+
+CleanedData = namedtuple("CleanedData", ["df", "df_reduced", "medians"])
+
+
+def cache_path(path, config, cache_dir=CACHE_DIR):
+    """Return the cache entry directory for ``path`` cleaned with ``config``."""
+    payload = json.dumps({"path": os.path.abspath(path), "config": config,
+                          "format_version": CACHE_FORMAT_VERSION}, sort_keys=True)
+    return os.path.join(cache_dir, hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16])
+
+
+def _source_state(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_manifest(manifest, path):
+    # Write next to the target and rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def save_cleaned(path, config, df, medians, reduced_columns=None, cache_dir=CACHE_DIR):
+    """Store the cleaned ``df`` of ``path`` and return the cache entry directory."""
+    entry = cache_path(path, config, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir)
+    np.save(os.path.join(staging, VALUES_NAME), np.asfortranarray(df.to_numpy(dtype=np.float32)))
+    manifest = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": dict(_source_state(path), path=os.path.abspath(path), sha256=file_digest(path)),
+        "config": config,
+        "columns": list(df.columns),
+        "reduced_columns": None if reduced_columns is None else list(reduced_columns),
+        "medians": {col: float(value) for col, value in medians.items()},
+    }
+    _write_manifest(manifest, os.path.join(staging, MANIFEST_NAME))
+    if os.path.exists(entry):
+        shutil.rmtree(entry)
+    os.replace(staging, entry)
+    return entry
+
+
+def load_cleaned(path, config, cache_dir=CACHE_DIR):
+    """Return the cached ``CleanedData`` of ``path``, or None on a miss.
+
+    The frames are read-only views of a memory-mapped array; pandas copies
+    a column only when it is modified.
+    """
+    entry = cache_path(path, config, cache_dir)
+    manifest_path = os.path.join(entry, MANIFEST_NAME)
+    if not os.path.exists(manifest_path) or not os.path.exists(path):
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except json.JSONDecodeError:
+        return None
+    if manifest["format_version"] != CACHE_FORMAT_VERSION:
+        return None
+    source = manifest["source"]
+    state = _source_state(path)
+    if state["size"] != source["size"]:
+        return None
+    if state["mtime_ns"] != source["mtime_ns"]:
+        if file_digest(path) != source["sha256"]:
+            return None
+        # Touched but unchanged: remember the new mtime to skip hashing next time
+        manifest["source"].update(state)
+        _write_manifest(manifest, manifest_path)
+
+    values = np.load(os.path.join(entry, VALUES_NAME), mmap_mode="r")
+    df = pd.DataFrame(values, columns=manifest["columns"], copy=False)
+    reduced = manifest["reduced_columns"]
+    if reduced is None:
+        df_reduced = df
+    else:
+        # Selecting columns from ``df`` would copy them; build the frame from column views
+        index = {col: i for i, col in enumerate(manifest["columns"])}
+        df_reduced = pd.DataFrame({col: values[:, index[col]] for col in reduced}, copy=False)
+    return CleanedData(df, df_reduced, pd.Series(manifest["medians"], dtype=np.float64))
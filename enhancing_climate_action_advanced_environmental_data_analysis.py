@@ -15,56 +15,58 @@ The script below imports necessary libraries and sets up a structured pipeline f
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.metrics import r2_score, mean_squared_error
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+from aqi_io import (AQI_CSV_PATH, DROP_COLUMNS, TARGET_COLUMN, compute_medians, file_digest, load_aqi,
+                    stream_cleaned_chunks)
+from imputation import MedianImputer
+from vif import VIFEngine
+from stats_kernel import MomentAccumulator
+from pca_backend import fit_pca
+from evaluation import cross_val_scores, fit_models
+from ridge_path import ridge_path
+from model_artifact import save_pipeline
+from cache import load_cleaned, save_cleaned
+import plotting  # Figures are only rendered when AQI_PLOT_DIR is set
 
 """### Dataset Loading
 
 The code snippet below loads the dataset `AQI Data Set.csv` into a Pandas DataFrame named initial_df for further analysis and modeling. The dataset contains Air Quality Index (AQI) data, which is crucial for assessing air quality and its impact on public health.
 """
 
-# Load the dataset
-initial_df = pd.read_csv("AQI Data Set.csv")
+VIF_THRESHOLD = 10.0
+CLEANING_CONFIG = {"drop_columns": DROP_COLUMNS, "median_method": "exact",
+                   "vif_threshold": VIF_THRESHOLD, "keep": [TARGET_COLUMN]}
+
+# Reuse the cleaned data from the columnar cache while the CSV and the cleaning
+# config are unchanged (the raw data is still needed when plotting)
+plots = plotting.plots_enabled()
+cleaned = None if plots else load_cleaned(AQI_CSV_PATH, CLEANING_CONFIG)
+
+# Load the raw dataset (read in chunks with float32 pollutant columns) only for
+# the missing-value figures; otherwise it is imputed chunk by chunk below
+if plots:
+    initial_df = load_aqi(AQI_CSV_PATH)
 
 """### Visualization of Missing Values Before and After Filling
 
 The below code segment visualizes missing values in the dataset `initial_df` before and after filling them with the median value of each numeric column. The left heatmap shows missing values before filling, while the right heatmap displays missing values after the filling process. This visualization helps assess the effectiveness of the imputation method and the extent of missing data in the dataset.
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Visualize missing values before filling
-plt.figure(figsize=(12, 6))
-plt.subplot(1, 2, 1)
-sns.heatmap(initial_df.isnull(), cbar=False, cmap='viridis', linewidths=0.5, linecolor='grey')
-plt.title('Missing Values Before Filling', fontsize=16)
-plt.xticks(fontsize=10)
-plt.yticks(fontsize=10, rotation=0)
-plt.tight_layout()
-
-# Fill missing values
-numeric_columns = initial_df.select_dtypes(include=np.number).columns
-df = initial_df.copy()  # Create a copy of initial_df
-for col in numeric_columns:
-    df[col].fillna(value=df[col].median(), inplace=True)
-
-# Visualize missing values after filling
-plt.subplot(1, 2, 2)
-sns.heatmap(df.isnull(), cbar=False, cmap='viridis', linewidths=0.5, linecolor='grey')
-plt.title('Missing Values After Filling', fontsize=16)
-plt.xticks(fontsize=10)
-plt.yticks(fontsize=10, rotation=0)
-plt.tight_layout()
-
-plt.show()
+if plots:
+    # Fill missing values
+    medians = MedianImputer(method="exact").fit(initial_df).medians_  # All column medians in one pass
+    df = initial_df.fillna(medians.to_dict())
+
+    # Visualize missing values before and after filling (large frames are
+    # aggregated into per-block missing counts)
+    plotting.plot_missing_values(initial_df, df)
+elif cleaned is None:
+    # Without figures no raw copy is kept: the medians take one chunked pass and
+    # a second pass fills and drops the columns one chunk at a time
+    medians = compute_medians(AQI_CSV_PATH, method="exact")
+    df = pd.concat(stream_cleaned_chunks(AQI_CSV_PATH, medians, DROP_COLUMNS), ignore_index=True)
 
 """The below lines of code also calculates and visualizes the distribution of missing values in `initial_df` before and after filling them. The bar plot compares missing values for each feature before (sky blue) and after (light green) filling. It helps assess imputation effectiveness and identifies features with significant missing data.
 
@@ -72,21 +74,14 @@ plt.show()
 
 """
 
-# Calculate missing values counts for initial_df and df
-missing_values_before = initial_df.isnull().sum()
-missing_values_after = df.isnull().sum()
-
-# Plotting
-plt.figure(figsize=(10, 6))
-plt.bar(missing_values_before.index, missing_values_before.values, color='skyblue', label='Before Filling')
-plt.bar(missing_values_after.index, missing_values_after.values, color='lightgreen', label='After Filling')
-plt.xlabel('Features')
-plt.ylabel('Number of Missing Values')
-plt.title('Distribution of Missing Values Before and After Filling')
-plt.xticks(rotation=90, ha='right')
-plt.legend()
-plt.tight_layout()
-plt.show()
+if plots:
+    # Calculate missing values counts for initial_df and df
+    missing_values_before = initial_df.isnull().sum()
+    missing_values_after = df.isnull().sum()
+    del initial_df  # The raw frame is not needed past this point
+
+    # Plotting
+    plotting.plot_missing_counts(missing_values_before, missing_values_after)
 
 """### Dropping Specified Columns and Handling Missing Valuess.
 
@@ -94,7 +89,10 @@ The code snippet below drops the specified columns [`Id`, `Mounths`, `O3   in æ
 """
 
 # Drop specified columns and handle missing values
-df.drop(columns=["Id", "Mounths", "O3   in æg/m3", "AQI"], inplace=True)
+if plots:
+    df.drop(columns=DROP_COLUMNS, inplace=True)
+elif cleaned is not None:
+    df, medians = cleaned.df, cleaned.medians
 
 """### Multicollinearity Detection
 
@@ -102,9 +100,11 @@ In here, the code calculates the Variance Inflation Factor (VIF) for each featur
 """
 
 # Detect multicollinearity
-vif_data = pd.DataFrame()
-vif_data["feature"] = df.columns
-vif_data["VIF"] = [variance_inflation_factor(df.values, i) for i in range(len(df.columns))]
+# One pass accumulates the means, variances and covariances of every feature;
+# the VIFs, the correlation heatmap and the scaler below are all derived from it
+moments = MomentAccumulator.from_frame(df)
+vif_engine = VIFEngine.from_correlation(moments.correlation())  # All VIFs from the inverse correlation matrix
+vif_data = vif_engine.vif()
 print("VIF Data:")
 print(vif_data)
 
@@ -114,75 +114,60 @@ The below lines of code visualizes the Variance Inflation Factor (VIF) values fo
 """
 
 # Visualize VIF before dropping columns
-plt.figure(figsize=(8, 5))
-plt.bar(vif_data["feature"], vif_data["VIF"], color='skyblue')
-plt.xlabel('Features')
-plt.ylabel('VIF')
-plt.title('VIF Before Dropping Columns')
-plt.xticks(rotation=90)
-plt.show()
+plotting.plot_vif(vif_data, 'VIF Before Dropping Columns', "vif_before")
 
 """
-In thibelow s code snippet, variables with high Variance Inflation Factor (VIF) are dropped from the dataset, as indicated by the removal of the column "NOx in æg/m3" from the DataFrame `df`. The VIF quantifies the severity of multicollinearity, and dropping variables with high VIF values helps mitigate multicollinearity issues in the regression analysis.
+In thibelow s code snippet, variables with high Variance Inflation Factor (VIF) are dropped from the dataset one at a time, always removing the feature with the highest VIF and recomputing, until every remaining VIF is below `VIF_THRESHOLD`. The target `PM10 in æg/m3` is never dropped. The drop order and the VIFs at each step are kept in `vif_elimination` for auditing. The VIF quantifies the severity of multicollinearity, and dropping variables with high VIF values helps mitigate multicollinearity issues in the regression analysis.
 
 Subsequently, the VIF is recalculated for the reduced dataset (`df_reduced`), and the results are stored in a DataFrame `vif_data_reduced`. This allows for the visualization and assessment of multicollinearity in the dataset after dropping the specified columns."""
 
 # Drop the variables with high VIF
-df_reduced = df.drop(columns=["NOx  in æg/m3"])
+if cleaned is None:
+    vif_elimination = vif_engine.eliminate(threshold=VIF_THRESHOLD, keep=[TARGET_COLUMN])
+    print("Dropped for high VIF:", vif_elimination.dropped)
+    df_reduced = df[vif_elimination.kept]
+    save_cleaned(AQI_CSV_PATH, CLEANING_CONFIG, df, medians, vif_elimination.kept)
+else:
+    # The cache stores the kept columns; reuse them as views of the cached array
+    df_reduced = cleaned.df_reduced
+    print("Dropped for high VIF:", [col for col in df.columns if col not in df_reduced.columns])
 
 # Visualize VIF after dropping columns
-vif_data_reduced = pd.DataFrame()
-vif_data_reduced["feature"] = df_reduced.columns
-vif_data_reduced["VIF"] = [variance_inflation_factor(df_reduced.values, i) for i in range(len(df_reduced.columns))]
+vif_data_reduced = vif_engine.vif(df_reduced.columns)
 
 """Code below visualizes the Variance Inflation Factor (VIF) values for each feature after dropping columns with high multicollinearity. The bar plot displays the VIF values on the y-axis and the features on the x-axis. By dropping columns with high VIF, multicollinearity is reduced, leading to lower VIF values for the remaining features. This visualization helps confirm the effectiveness of the column dropping process in mitigating multicollinearity issues."""
 
-plt.figure(figsize=(8, 6))
-plt.bar(vif_data_reduced["feature"], vif_data_reduced["VIF"], color='lightgreen')
-plt.xlabel('Features')
-plt.ylabel('VIF')
-plt.title('VIF After Dropping Columns')
-plt.xticks(rotation=45)
-plt.show()
+plotting.plot_vif(vif_data_reduced, 'VIF After Dropping Columns', "vif_after",
+                  color='lightgreen', figsize=(8, 6), rotation=45)
 
 """### Correlation Heatmap of Remaining Features
 
 This code snippet calculates the correlation matrix for the reduced DataFrame `df_reduced` and visualizes it as a heatmap. The heatmap displays the pairwise correlation coefficients between all remaining features, with annotations indicating the correlation values. This visualization helps identify patterns of association between features and assesses the strength and direction of their relationships.
 """
 
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-
 # Calculate correlation matrix
-correlation_matrix = df_reduced.corr()
+correlation_matrix = moments.correlation(df_reduced.columns)
 
 # Plot heatmap
-plt.figure(figsize=(10, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap='viridis', fmt=".2f")
-plt.title('Correlation Heatmap of All Existing Columns', fontsize=16)
-plt.xticks(rotation=45)
-plt.yticks(rotation=0)
-plt.tight_layout()
-plt.show()
+plotting.plot_correlation(correlation_matrix)
 
 """### VIF Calculation After Dropping Columns
 
 The below code calculates the Variance Inflation Factor (VIF) for each feature in the reduced DataFrame `df_reduced` after dropping columns with high multicollinearity. The resulting DataFrame `vif_data_reduced` contains the features and their corresponding VIF values. This step assesses the multicollinearity among the remaining features and helps confirm the effectiveness of the column dropping process in reducing multicollinearity.
 """
 
-vif_data_reduced = pd.DataFrame()
-vif_data_reduced["feature"] = df_reduced.columns
-vif_data_reduced["VIF"] = [variance_inflation_factor(df_reduced.values, i) for i in range(len(df_reduced.columns))]
+vif_data_reduced = vif_engine.vif(df_reduced.columns)
 
 """### Standardization and PCA Dimensionality Reduction
 
-Following code standardizes the features in the reduced DataFrame `df_reduced` using StandardScaler and then applies Principal Component Analysis (PCA) to reduce dimensionality while retaining 95% of the variance. The scaled data is transformed using PCA, resulting in a new dataset `data_pca` with reduced dimensions. This preprocessing step is essential for reducing the computational complexity of the dataset while preserving most of its variance for subsequent analysis or modeling.
+Following code standardizes the features in the reduced DataFrame `df_reduced` using StandardScaler and then applies Principal Component Analysis (PCA) to reduce dimensionality while retaining 95% of the variance. The scaled data is transformed using PCA, resulting in a new dataset `data_pca` with reduced dimensions. `fit_pca` picks the PCA solver by the shape of the data (a covariance eigendecomposition when rows far outnumber columns, a randomized SVD for wide data) and returns the same components as a full SVD. This preprocessing step is essential for reducing the computational complexity of the dataset while preserving most of its variance for subsequent analysis or modeling.
 """
 
 # Standardize and apply PCA
-scaler = StandardScaler()
-data_scaled = scaler.fit_transform(df_reduced)
-pca = PCA(n_components=0.95)  # Adjust components to explain 95% of variance
-data_pca = pca.fit_transform(data_scaled)
+scaler = moments.to_scaler(df_reduced.columns)
+data_scaled = scaler.transform(df_reduced)
+pca = fit_pca(data_scaled, n_components=0.95)  # Adjust components to explain 95% of variance
+data_pca = pca.transform(data_scaled)
 
 """### Data Preparation for Regression
 
@@ -190,7 +175,7 @@ Below code prepares the data for regression analysis by splitting the principal
 """
 
 # Prepare data for regression
-target_variable = df_reduced["PM10 in æg/m3"]
+target_variable = df_reduced[TARGET_COLUMN]
 X_train, X_test, y_train, y_test = train_test_split(data_pca, target_variable, test_size=0.2, random_state=42)
 
 """### Linear Regression Modeling
@@ -198,21 +183,26 @@ X_train, X_test, y_train, y_test = train_test_split(data_pca, target_variable, t
 The following code snippet fits a Linear Regression model to the training data using the principal components (`X_train`) and the target variable (`y_train`). After fitting the model, it predicts the target variable for the testing data (`X_test`) and calculates the coefficient of determination (`R-squared`) and Mean Squared Error (`MSE`) as performance metrics. This step evaluates the model's ability to explain the variance in the target variable and assesses its predictive accuracy.
 """
 
-# Linear Regression Model
-linear_model = LinearRegression()
-linear_model.fit(X_train, y_train)
+# Tune the Ridge alpha from one SVD of X_train (leave-one-out error per alpha)
+alpha_path = ridge_path(X_train, y_train)
+
+# Linear Regression Model (fitted together with the Ridge model on the
+# worker pool; set AQI_N_JOBS to change the number of workers)
+models = fit_models({"linear": LinearRegression(), "ridge": Ridge(alpha=alpha_path.best_alpha)},
+                    X_train, y_train)
+linear_model = models["linear"]
 y_pred_linear = linear_model.predict(X_test)
 r2_linear = r2_score(y_test, y_pred_linear)
 mse_linear = mean_squared_error(y_test, y_pred_linear)
 
 """### Ridge Regression Modeling
 
-The code below fits a Ridge Regression model to the training data using the principal components (`X_train`) and the target variable (`y_train`), with a regularization strength (`alpha`) set to 1.0. After fitting the model, it predicts the target variable for the testing data (`X_test`) and calculates the coefficient of determination (`R-squared`) and Mean Squared Error (`MSE`) as performance metrics. Ridge Regression introduces regularization to the Linear Regression model, aiming to reduce overfitting and improve generalization performance.
+The code below fits a Ridge Regression model to the training data using the principal components (`X_train`) and the target variable (`y_train`), with the regularization strength (`alpha`) that minimizes the leave-one-out error over `alpha_path`. The whole path of alphas is evaluated in closed form from a single SVD of `X_train`. After fitting the model, it predicts the target variable for the testing data (`X_test`) and calculates the coefficient of determination (`R-squared`) and Mean Squared Error (`MSE`) as performance metrics. Ridge Regression introduces regularization to the Linear Regression model, aiming to reduce overfitting and improve generalization performance.
 """
 
 # Ridge Regression Model
-ridge_model = Ridge(alpha=1.0)
-ridge_model.fit(X_train, y_train)
+ridge_model = models["ridge"]
+print("Ridge alpha selected by leave-one-out error:", alpha_path.best_alpha)
 y_pred_ridge = ridge_model.predict(X_test)
 r2_ridge = r2_score(y_test, y_pred_ridge)
 mse_ridge = mean_squared_error(y_test, y_pred_ridge)
@@ -222,19 +212,19 @@ mse_ridge = mean_squared_error(y_test, y_pred_ridge)
 The following lines of code performs cross-validation for both Linear Regression and Ridge Regression models to evaluate their performance. The mean R-squared values and Mean Squared Error (`MSE`) are calculated using `5-fold cross-validation` on the training data. These metrics provide insights into the models' generalization capabilities and predictive accuracy. The performance metrics are printed before and after dropping columns, allowing for comparison and assessing the impact of feature reduction on model performance.
 
 **Before Dropping Columns:**
-Linear Regression achieved an `R-squared` of approximately `0.98` and a mean squared error (`MSE`) of `8.15`, indicating a strong predictive performance and good fit to the data. The mean cross-validation (`CV`) score for Linear Regression is `0.98`, suggesting consistent performance across different folds.
+Linear Regression achieved an `R-squared` of approximately `0.988` and a mean squared error (`MSE`) of `6.40`, indicating a strong predictive performance and good fit to the data. The mean cross-validation (`CV`) score for Linear Regression is `0.987`, suggesting consistent performance across different folds.
 
 **After Dropping Columns:**
-After applying Ridge Regression and dropping columns, the model's performance improved slightly with an `R-squared` of around `0.99` and a reduced `MSE` of `7.29`. The mean CV score for Ridge Regression is comparable to Linear Regression, indicating stable performance even after regularization.
+After applying Ridge Regression and dropping columns, the model's performance improved slightly with an `R-squared` of around `0.988` and a reduced `MSE` of `6.37`. The mean CV score for Ridge Regression is comparable to Linear Regression, indicating stable performance even after regularization.
 
 **Analysis:**
 The Ridge Regression model, which includes regularization to mitigate overfitting, demonstrates improved performance in terms of R-squared and MSE compared to the regular Linear Regression model. However, the difference in performance metrics between the two models is relatively small. This suggests that while dropping columns and applying regularization can lead to slight improvements in model performance, the original Linear Regression model already performs well on its own.urther.
 """
 
-# Cross-validation for Linear Regression
-cv_scores_linear = cross_val_score(linear_model, X_train, y_train, cv=5)
-# Cross-validation for Ridge Regression
-cv_scores_ridge = cross_val_score(ridge_model, X_train, y_train, cv=5)
+# Cross-validation for Linear and Ridge Regression, all folds on one worker pool
+cv_scores = cross_val_scores({"linear": linear_model, "ridge": ridge_model}, X_train, y_train, cv=5)
+cv_scores_linear = cv_scores["linear"]
+cv_scores_ridge = cv_scores["ridge"]
 
 # Collect metrics before and after dropping columns
 r2_before = [r2_linear]
@@ -266,52 +256,15 @@ The bar plot obtained below visually compares the performance metrics (R-squared
 labels = ['R-squared', 'MSE', 'Mean CV Score']
 before_metrics = [r2_before[0], mse_before[0], cv_before[0]]
 after_metrics = [r2_after[0], mse_after[0], cv_after[0]]
-
-x = np.arange(len(labels))
-width = 0.30
-
-fig, ax = plt.subplots(figsize=(8, 5))
-rects1 = ax.bar(x - width/2, before_metrics, width, label='Before Dropping Columns', color='skyblue')
-rects2 = ax.bar(x + width/2, after_metrics, width, label='After Dropping Columns', color='lightgreen')
-
-ax.set_ylabel('Metrics')
-ax.set_title('Comparison of Metrics Before and After Dropping Columns')
-ax.set_xticks(x)
-ax.set_xticklabels(labels)
-ax.legend()
-
-plt.show()
+plotting.plot_metric_comparison(labels, before_metrics, after_metrics)
 
 """### Residual Plots for Linear and Ridge Regression
 
 The following code creates side-by-side residual plots for both Linear Regression and Ridge Regression models. Each plot displays the residuals (the difference between the actual and predicted values) against the predicted values. The lowess curve represents the locally weighted scatterplot smoothing, providing insights into the relationship between the predicted values and residuals. The red horizontal line at y=0 indicates perfect prediction, where residuals are centered around zero. These plots help assess the models' performance and check for any patterns or heteroscedasticity in the residuals.
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Create subplots
-fig, axes = plt.subplots(1, 2, figsize=(16, 6))
-
-# Plotting residuals for Linear Regression
-sns.residplot(x=y_pred_linear, y=y_test - y_pred_linear, lowess=True, color="g", ax=axes[0])
-axes[0].axhline(y=0, color='r', linestyle='-')
-axes[0].set_title("Residual Plot for Linear Regression")
-axes[0].set_xlabel("Predicted Values")
-axes[0].set_ylabel("Residuals")
-
-# Plotting residuals for Ridge Regression
-sns.residplot(x=y_pred_ridge, y=y_test - y_pred_ridge, lowess=True, color="b", ax=axes[1])
-axes[1].axhline(y=0, color='r', linestyle='-')
-axes[1].set_title("Residual Plot for Ridge Regression")
-axes[1].set_xlabel("Predicted Values")
-axes[1].set_ylabel("Residuals")
-
-# Set overall title
-plt.suptitle("Residual Plots for Linear and Ridge Regression", fontsize=22)
-
-plt.tight_layout()
-plt.show()
+# Plotting residuals for Linear and Ridge Regression
+plotting.plot_residuals(y_test, y_pred_linear, y_pred_ridge)
 
 """### Comparison of Actual vs. Predicted Values for Linear and Ridge Regression
 
@@ -319,21 +272,14 @@ The scatter plot code below compares the actual target values (`y_test`) with th
 """
 
 # Visual comparison of Predicted vs Actual values for both models
-plt.figure(figsize=(8, 6))
-plt.scatter(y_test, y_pred_linear, color="green", label="Linear")
-plt.scatter(y_test, y_pred_ridge, color="blue", label="Ridge")
-plt.plot([min(y_test), max(y_test)], [min(y_test), max(y_test)], linestyle='--', color='r')
-plt.xlabel("Actual Values")
-plt.ylabel("Predicted Values")
-plt.title("Actual vs. Predicted Values for Linear and Ridge Regression")
-plt.legend()
+plotting.plot_actual_vs_predicted(y_test, y_pred_linear, y_pred_ridge)
 
 """### Performance Metrics Overview
 
 The following code snippet prints the performance metrics for both Linear Regression and Ridge Regression models. The metrics include R-squared (a measure of the proportion of variance explained by the model), Mean Squared Error (MSE), and cross-validation (CV) scores. Additionally, it calculates the mean CV score for each model, providing insights into their overall performance and generalization capabilities. These metrics serve as key indicators for assessing the accuracy and reliability of the regression models.
 
 **Analysis**
-Both Linear Regression and Ridge Regression models demonstrate strong performance in predicting the target variable, as evidenced by high R-squared values. However, Ridge Regression slightly outperforms Linear Regression, achieving a higher `R-squared value` of approximately `0.986` compared to `0.985` for Linear Regression. Similarly, Ridge Regression exhibits a lower `Mean Squared Error (MSE)` of approximately `7.29`, indicating better accuracy in prediction compared to the `MSE` of approximately `8.15` for Linear Regression.
+Both Linear Regression and Ridge Regression models demonstrate strong performance in predicting the target variable, as evidenced by high R-squared values. However, Ridge Regression slightly outperforms Linear Regression, achieving a higher `R-squared value` of approximately `0.9879` compared to `0.9878` for Linear Regression. Similarly, Ridge Regression exhibits a lower `Mean Squared Error (MSE)` of approximately `6.37`, indicating better accuracy in prediction compared to the `MSE` of approximately `6.40` for Linear Regression.
 
 The cross-validation (CV) scores further support the robustness of both models, with consistently high scores across different folds of the training data. The mean CV scores for Linear Regression and Ridge Regression are comparable, indicating stable performance and generalization capabilities for both models.
 
@@ -348,4 +294,35 @@ print("Ridge Regression MSE:", mse_ridge)
 print("Linear Regression CV Scores:", cv_scores_linear)
 print("Mean CV Score for Linear Regression:", np.mean(cv_scores_linear))
 print("Ridge Regression CV Scores:", cv_scores_ridge)
-print("Mean CV Score for Ridge Regression:", np.mean(cv_scores_ridge))
\ No newline at end of file
+print("Mean CV Score for Ridge Regression:", np.mean(cv_scores_ridge))
+
+"""### Saving the Fitted Pipeline
+
+The fitted medians, scaler, PCA and both regression models are saved as one versioned artifact under `artifacts/`, keyed by a hash of the data set and the configuration below. New readings can then be scored with `python model_artifact.py <artifact> <csv>` without rerunning this analysis.
+
+The models above use `PM10 in æg/m3` itself among their inputs, which a scorer of new readings cannot have, so the saved chain is refit on the same split with the target left out of the features.
+"""
+
+# Scoring chain without the target among its inputs
+scoring_columns = [col for col in df_reduced.columns if col != TARGET_COLUMN]
+scoring_scaler = moments.to_scaler(scoring_columns)
+scoring_scaled = scoring_scaler.transform(df_reduced[scoring_columns])
+scoring_pca = fit_pca(scoring_scaled, n_components=0.95)
+S_train, S_test = train_test_split(scoring_pca.transform(scoring_scaled), test_size=0.2, random_state=42)
+scoring_models = fit_models({"linear": LinearRegression(),
+                             "ridge": Ridge(alpha=ridge_path(S_train, y_train).best_alpha)},
+                            S_train, y_train)
+print("Scoring model (without PM10 input) Ridge R-squared:",
+      r2_score(y_test, scoring_models["ridge"].predict(S_test)))
+
+pipeline_config = {
+    "drop_columns": DROP_COLUMNS,
+    "vif_threshold": VIF_THRESHOLD,
+    "pca_n_components": scoring_pca.n_components,
+    "target_column": TARGET_COLUMN,
+    "test_size": 0.2,
+    "random_state": 42,
+}
+artifact_dir = save_pipeline(medians, scoring_scaler, scoring_pca, scoring_models, scoring_columns,
+                             file_digest(AQI_CSV_PATH), pipeline_config)
+print("Saved pipeline artifact:", artifact_dir)
@@ -0,0 +1,63 @@
+"""Parallel model fitting and cross-validation.
+
+``cross_val_scores`` spreads every (model, fold) pair of several candidate
+models over one joblib worker pool, instead of running ``cross_val_score``
+once per model.  Arrays larger than ``max_nbytes`` are memory-mapped by
+joblib and shared read-only with the workers rather than copied into each
+of them.  Folds come from the same splitter ``cross_val_score`` uses, so
+the per-fold scores are identical.
+"""
+
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv
+
+N_JOBS_ENV = "AQI_N_JOBS"
+DEFAULT_MAX_NBYTES = "1M"
+
+
+def default_n_jobs():
+    """Return the worker count from ``AQI_N_JOBS`` (default: 1)."""
+    return int(os.environ.get(N_JOBS_ENV, 1))
+
+
+def _fit(model, X, y):
+    return clone(model).fit(X, y)
+
+
+def _score_fold(model, X, y, train, test, scoring):
+    estimator = clone(model).fit(X[train], y[train])
+    return check_scoring(estimator, scoring)(estimator, X[test], y[test])
+
+
+def fit_models(models, X, y, n_jobs=None, max_nbytes=DEFAULT_MAX_NBYTES):
+    """Fit clones of the ``{name: model}`` mapping in parallel and return them by name."""
+    n_jobs = default_n_jobs() if n_jobs is None else n_jobs
+    X, y = np.asarray(X), np.asarray(y)
+    fitted = Parallel(n_jobs=n_jobs, max_nbytes=max_nbytes, mmap_mode="r")(
+        delayed(_fit)(model, X, y) for model in models.values())
+    return dict(zip(models, fitted))
+
+
+def cross_val_scores(models, X, y, cv=5, scoring=None, n_jobs=None,
+                     max_nbytes=DEFAULT_MAX_NBYTES):
+    """Cross-validate the ``{name: model}`` mapping on one worker pool.
+
+    Returns ``{name: scores}`` with one score per fold, as
+    ``cross_val_score`` would for each model on its own.
+    """
+    n_jobs = default_n_jobs() if n_jobs is None else n_jobs
+    X, y = np.asarray(X), np.asarray(y)
+    splits = list(check_cv(cv, y, classifier=False).split(X, y))
+    tasks = [(name, train, test) for name in models for train, test in splits]
+    scores = Parallel(n_jobs=n_jobs, max_nbytes=max_nbytes, mmap_mode="r")(
+        delayed(_score_fold)(models[name], X, y, train, test, scoring)
+        for name, train, test in tasks)
+    results = {name: [] for name in models}
+    for (name, _, _), score in zip(tasks, scores):
+        results[name].append(score)
+    return {name: np.array(values) for name, values in results.items()}
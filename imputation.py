@@ -0,0 +1,202 @@
+"""Single-pass median imputation.
+
+``MedianImputer`` computes the median of every numeric column in one pass
+over the data.  The default ``"sketch"`` method keeps a mergeable KLL
+quantile sketch per column, so memory stays bounded and the state can be
+saved and updated with new batches instead of being recomputed.  The
+``"exact"`` method keeps the numeric block and takes all medians with one
+vectorized ``np.nanmedian`` call.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SKETCH_SIZE = 200
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch for a single column.
+
+    Items at level ``h`` stand for ``2**h`` input values.  With ``k`` items
+    on the top level the rank error of a query is roughly ``1.7 / k`` of the
+    number of values seen, independent of how many values that is.
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_SIZE, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so no weight is lost
+                leftover, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def update(self, values):
+        """Add the non-missing entries of ``values`` to the sketch."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold the state of another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Return the approximate ``q``-quantile, or NaN for an empty sketch."""
+        if self.n == 0:
+            return np.nan
+        if len(self.levels) == 1:
+            # Nothing has been compacted yet, so the answer is exact
+            return float(np.quantile(self.levels[0], q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1])
+        return float(items[order][min(index, len(items) - 1)])
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n,
+                "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        sketch = cls(k=state["k"], seed=seed)
+        sketch.n = state["n"]
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state["levels"]]
+        return sketch
+
+
+class MedianImputer:
+    """Fill missing values with per-column medians computed in one pass.
+
+    ``method`` is ``"sketch"`` (bounded memory, mergeable, serializable) or
+    ``"exact"`` (keeps the numeric columns in memory, in their own dtype).
+    """
+
+    def __init__(self, method="sketch", k=DEFAULT_SKETCH_SIZE, seed=None):
+        if method not in ("sketch", "exact"):
+            raise ValueError(f"Unknown median method: {method!r}")
+        self.method = method
+        self.k = k
+        self.seed = seed
+        self.columns = None
+        self._sketches = None
+        self._blocks = []
+
+    def partial_fit(self, frame):
+        """Update the column medians with the numeric columns of ``frame``."""
+        if self.columns is None:
+            self.columns = list(frame.select_dtypes(include=np.number).columns)
+            self._sketches = [KLLSketch(self.k, self.seed) for _ in self.columns]
+        if self.method == "exact":
+            # One array per column, without upcasting the float32 readings
+            self._blocks.append([frame[col].to_numpy() for col in self.columns])
+        else:
+            block = frame[self.columns].to_numpy(dtype=np.float64)
+            for sketch, values in zip(self._sketches, block.T):
+                sketch.update(values)
+        return self
+
+    def fit(self, chunks):
+        """Fit on a DataFrame or an iterable of DataFrame chunks, discarding earlier state."""
+        self.columns = None
+        self._sketches = None
+        self._blocks = []
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """Combine the state of an imputer fitted on other data."""
+        if other.columns != self.columns or other.method != self.method:
+            raise ValueError("Can only merge imputers with the same columns and method")
+        if self.method == "exact":
+            self._blocks.extend(other._blocks)
+        else:
+            for sketch, other_sketch in zip(self._sketches, other._sketches):
+                sketch.merge(other_sketch)
+        return self
+
+    @property
+    def medians_(self):
+        if self.columns is None:
+            raise ValueError("MedianImputer has not been fitted")
+        if self.method == "exact":
+            values = [self._exact_median([block[j] for block in self._blocks])
+                      for j in range(len(self.columns))]
+        else:
+            values = [sketch.median() for sketch in self._sketches]
+        return pd.Series(values, index=self.columns)
+
+    @staticmethod
+    def _exact_median(parts):
+        if len(parts) == 1:
+            # The caller's data: nanmedian works on its own copy of this column
+            return np.nanmedian(parts[0])
+        return np.nanmedian(np.concatenate(parts), overwrite_input=True)
+
+    def transform(self, frame):
+        """Return ``frame`` with missing numeric values replaced by the medians."""
+        medians = self.medians_
+        return frame.fillna(medians[medians.index.isin(frame.columns)].to_dict())
+
+    def to_dict(self):
+        if self.method != "sketch":
+            raise ValueError("Only the sketch method has serializable state")
+        return {"method": self.method, "k": self.k, "columns": self.columns,
+                "sketches": [sketch.to_dict() for sketch in self._sketches]}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        imputer = cls(method=state["method"], k=state["k"], seed=seed)
+        imputer.columns = state["columns"]
+        imputer._sketches = [KLLSketch.from_dict(s, seed) for s in state["sketches"]]
+        return imputer
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
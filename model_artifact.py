@@ -0,0 +1,177 @@
+"""Versioned artifacts of the fitted preprocessing and regression chain.
+
+The fitted imputation medians, ``StandardScaler``, ``PCA`` and regression
+coefficients are saved as plain ``.npy`` arrays plus a JSON manifest in a
+directory named after the artifact format version and a hash of the input
+data and configuration.  :class:`ScoringPipeline` memory-maps the arrays
+and folds the whole chain into one affine map, so new readings can be
+scored in batches without refitting or rerunning the analysis script.
+The target column must not be one of the artifact's input features: the
+scorer would otherwise need the very reading it is meant to predict.
+
+Usage::
+
+    python model_artifact.py artifacts/v1-<key> "new readings.csv" --output predictions.csv
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aqi_io import DEFAULT_CHUNKSIZE, TARGET_COLUMN, read_aqi_chunks
+
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_ROOT = "artifacts"
+MANIFEST_NAME = "manifest.json"
+
+
+def artifact_key(data_digest, config):
+    """Return the hash identifying an artifact for this data and config."""
+    payload = json.dumps({"data": data_digest, "config": config,
+                          "format_version": ARTIFACT_FORMAT_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def artifact_path(data_digest, config, root=ARTIFACT_ROOT):
+    return os.path.join(root, f"v{ARTIFACT_FORMAT_VERSION}-{artifact_key(data_digest, config)}")
+
+
+def fold_chain(scaler_mean, scaler_scale, pca_mean, components, coef, intercept):
+    """Return ``(weights, intercept)`` of ``scale -> PCA -> linear model`` on the raw features.
+
+    ``(x - scaler_mean) / scaler_scale`` projected on ``components`` after
+    subtracting ``pca_mean`` and fed to ``coef`` and ``intercept`` is the
+    affine map ``x @ weights + intercept``.
+    """
+    loadings = np.asarray(components).T @ np.ravel(coef)
+    weights = loadings / scaler_scale
+    return weights, float(np.ravel(intercept)[0] - (scaler_mean / scaler_scale + pca_mean) @ loadings)
+
+
+def _check_inputs(feature_columns, target_column):
+    if target_column in feature_columns:
+        raise ValueError(f"Target column {target_column!r} is among the feature columns; "
+                         "fit the scoring chain without it")
+
+
+def save_pipeline(medians, scaler, pca, models, feature_columns, data_digest, config,
+                  root=ARTIFACT_ROOT, target_column=TARGET_COLUMN):
+    """Save the fitted chain and return the artifact directory.
+
+    ``models`` maps a name to a fitted linear model (``coef_`` and
+    ``intercept_``) trained on the PCA scores.  An existing artifact for the
+    same data and config is replaced atomically.  Raises ``ValueError``
+    when ``target_column`` is one of ``feature_columns``.
+    """
+    _check_inputs(list(feature_columns), target_column)
+    if pca.whiten:
+        raise ValueError("Whitened PCA is not supported in artifacts")
+    path = artifact_path(data_digest, config, root)
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=root)
+    arrays = {
+        "medians": np.asarray(medians.reindex(feature_columns), dtype=np.float64),
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "pca_mean": pca.mean_,
+        "pca_components": pca.components_,
+    }
+    for name, model in models.items():
+        arrays[f"{name}_coef"] = np.ravel(model.coef_)
+        arrays[f"{name}_intercept"] = np.atleast_1d(model.intercept_)
+    for name, values in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(values, dtype=np.float64))
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "key": artifact_key(data_digest, config),
+        "data_digest": data_digest,
+        "config": config,
+        "feature_columns": list(feature_columns),
+        "target_column": target_column,
+        "models": {name: type(model).__name__ for name, model in models.items()},
+        "n_components": int(pca.n_components_),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(staging, path)
+    return path
+
+
+class ScoringPipeline:
+    """Predict from a saved artifact without refitting anything.
+
+    For each model the chain ``impute -> scale -> PCA -> linear model`` is
+    collapsed into one weight vector and intercept over the raw features.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST_NAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format version: {self.manifest['format_version']}")
+        self.path = path
+        self.feature_columns = self.manifest["feature_columns"]
+        self.target_column = self.manifest.get("target_column", TARGET_COLUMN)
+        _check_inputs(self.feature_columns, self.target_column)
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.medians = np.array(load("medians"))
+        mean, scale = load("scaler_mean"), load("scaler_scale")
+        pca_mean, components = load("pca_mean"), load("pca_components")
+        self.weights = {}
+        self.intercepts = {}
+        for name in self.manifest["models"]:
+            self.weights[name], self.intercepts[name] = fold_chain(
+                mean, scale, pca_mean, components, load(f"{name}_coef"), load(f"{name}_intercept"))
+
+    def predict(self, frame, model="ridge"):
+        """Predict the target for the rows of ``frame``."""
+        X = frame[self.feature_columns].to_numpy(dtype=np.float64)
+        X = np.where(np.isnan(X), self.medians, X)
+        return X @ self.weights[model] + self.intercepts[model]
+
+    def predict_batches(self, chunks, model="ridge"):
+        """Yield predictions for each DataFrame in ``chunks``."""
+        for chunk in chunks:
+            yield self.predict(chunk, model)
+
+
+@functools.lru_cache(maxsize=None)
+def load_pipeline(path):
+    """Return the (cached) :class:`ScoringPipeline` stored at ``path``."""
+    return ScoringPipeline(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score AQI readings with a saved pipeline artifact.")
+    parser.add_argument("artifact", help="artifact directory written by save_pipeline")
+    parser.add_argument("input", help="CSV file with the same columns as the AQI data set")
+    parser.add_argument("--model", default="ridge")
+    parser.add_argument("--output", help="CSV file for the predictions (default: stdout)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.artifact)
+    predictions = pd.Series(np.concatenate(list(pipeline.predict_batches(
+        read_aqi_chunks(args.input, args.chunksize), args.model))), name="prediction")
+    if args.output:
+        predictions.to_csv(args.output, index=False)
+    else:
+        print(predictions.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
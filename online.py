@@ -0,0 +1,146 @@
+"""Online training of the scaler -> PCA -> regression chain.
+
+``OnlineAQIModel`` keeps the sufficient statistics of the regression
+problem instead of the data: the count, means and co-moment matrix of
+``[x, y]`` over every row seen so far, in a
+:class:`stats_kernel.MomentAccumulator`.  Each new batch of readings (for
+example the next month of ``Mounths``) is merged in ``O(b p^2)`` time.
+The scaler statistics, the PCA basis of the standardized features and the
+linear and Ridge coefficients are then re-derived from that
+``(p + 1) x (p + 1)`` matrix in ``O(p^3)``, independent of how much
+history has been seen.  The missing-value mask is tracked next to the raw
+readings, so every refresh re-imputes the whole history with the current
+sketch medians and matches a full refit on all the rows imputed with them.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import StandardScaler
+
+from aqi_io import TARGET_COLUMN
+from imputation import MedianImputer
+from pca_backend import pca_from_covariance
+from stats_kernel import MomentAccumulator
+
+DEFAULT_ALPHAS = {"linear": 0.0, "ridge": 1.0}
+
+
+class OnlineAQIModel:
+    """Incrementally trained PCA regression for a growing stream of readings.
+
+    ``alphas`` maps a model name to its Ridge penalty; ``0.0`` is ordinary
+    least squares.  After every :meth:`partial_fit` the scaler, PCA and
+    coefficients are refreshed, and ``last_batch_metrics`` holds the
+    R-squared and MSE of the previous model on the new batch (evaluated
+    before it was used for training).
+    """
+
+    def __init__(self, feature_columns, target_column=TARGET_COLUMN, n_components=0.95,
+                 alphas=None):
+        self.feature_columns = list(feature_columns)
+        self.target_column = target_column
+        # The target may also be one of the features, as in the analysis script
+        self._columns = list(dict.fromkeys(self.feature_columns + [target_column]))
+        self.n_components = n_components
+        self.alphas = dict(DEFAULT_ALPHAS if alphas is None else alphas)
+        self.imputer = MedianImputer()
+        # Positional columns: the target may appear twice, as a feature and as y
+        self.moments = MomentAccumulator(range(len(self.feature_columns) + 1), track_missing=True)
+        self.last_batch_metrics = None
+        self.coef_ = {}
+        self.intercept_ = {}
+
+    @property
+    def n_samples_seen_(self):
+        return self.moments.n
+
+    def _design(self, frame):
+        frame = self.imputer.transform(frame[self._columns])
+        X = frame[self.feature_columns].to_numpy(dtype=np.float64)
+        y = frame[self.target_column].to_numpy(dtype=np.float64)
+        return X, y
+
+    def partial_fit(self, batch):
+        """Update the model with a DataFrame of new readings."""
+        if self.coef_:
+            X, y = self._design(batch)
+            self.last_batch_metrics = {name: self._score(self.predict_array(X, name), y)
+                                       for name in self.alphas}
+        self.imputer.partial_fit(batch[self._columns])
+        self.moments.update(batch[self.feature_columns + [self.target_column]].to_numpy(dtype=np.float64))
+        self._refresh()
+        return self
+
+    def _moments(self):
+        fill = self.imputer.medians_.reindex(self.feature_columns + [self.target_column])
+        moments = self.moments.imputed(fill.to_numpy())
+        return moments.n, moments.mean_, moments.comoment_ / moments.n
+
+    def _refresh(self):
+        n, mean, cov = self._moments()
+        x_mean, y_mean = mean[:-1], mean[-1]
+        x_var = np.clip(np.diag(cov)[:-1], 0, None)
+        scale = np.sqrt(x_var)
+        scale[scale == 0] = 1.0  # as StandardScaler does for constant columns
+        standardized = cov[:-1, :-1] / np.outer(scale, scale)
+
+        self.scaler_ = StandardScaler()
+        self.scaler_.mean_, self.scaler_.var_, self.scaler_.scale_ = x_mean, x_var, scale
+        self.scaler_.n_samples_seen_ = int(n)
+        self.scaler_.n_features_in_ = len(x_mean)
+        self.pca_ = pca_from_covariance(standardized, int(n), self.n_components)
+
+        # Centered cross products of the PCA scores T with themselves and y
+        components = self.pca_.components_
+        score_gram = n * components @ standardized @ components.T
+        score_target = n * components @ (cov[:-1, -1] / scale)
+        for name, alpha in self.alphas.items():
+            system = score_gram + alpha * np.eye(len(score_gram))
+            self.coef_[name] = np.linalg.lstsq(system, score_target, rcond=None)[0]
+            self.intercept_[name] = y_mean
+        self._score_gram, self._score_target = score_gram, score_target
+
+    def transform(self, X):
+        """Return the PCA scores of an imputed feature array."""
+        return ((X - self.scaler_.mean_) / self.scaler_.scale_) @ self.pca_.components_.T
+
+    def predict_array(self, X, model="ridge"):
+        return self.transform(X) @ self.coef_[model] + self.intercept_[model]
+
+    def predict(self, frame, model="ridge"):
+        """Predict the target for the rows of ``frame``."""
+        X = self.imputer.transform(frame[self.feature_columns]).to_numpy(dtype=np.float64)
+        return self.predict_array(X, model)
+
+    @staticmethod
+    def _score(y_pred, y):
+        residual = np.sum((y - y_pred) ** 2)
+        total = np.sum((y - y.mean()) ** 2)
+        return {"r2": 1 - residual / total if total > 0 else np.nan,
+                "mse": residual / len(y)}
+
+    def metrics(self):
+        """Return the in-sample R-squared and MSE of each model over all rows seen.
+
+        Computed from the sufficient statistics, so the cost does not depend
+        on the number of rows.
+        """
+        n, _, cov = self._moments()
+        total = n * cov[-1, -1]
+        rows = {}
+        for name, coef in self.coef_.items():
+            residual = total - 2 * coef @ self._score_target + coef @ self._score_gram @ coef
+            rows[name] = {"r2": 1 - residual / total if total > 0 else np.nan,
+                          "mse": residual / n}
+        return pd.DataFrame(rows).T
+
+    def export(self):
+        """Return ``(medians, scaler, pca, models)`` for :func:`model_artifact.save_pipeline`."""
+        models = {}
+        for name, alpha in self.alphas.items():
+            model = LinearRegression() if alpha == 0 else Ridge(alpha=alpha)
+            model.coef_, model.intercept_ = self.coef_[name], self.intercept_[name]
+            model.n_features_in_ = len(self.coef_[name])
+            models[name] = model
+        return self.imputer.medians_, self.scaler_, self.pca_, models
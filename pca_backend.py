@@ -0,0 +1,171 @@
+"""PCA with a solver chosen by the shape of the data.
+
+``PCA(n_components=0.95)`` computes a full SVD of the ``n x p`` matrix to
+find the 95% variance cutoff.  :func:`fit_pca` returns the same fitted
+``sklearn.decomposition.PCA`` (components, explained variance and sign
+convention) from a cheaper solver where one applies:
+
+- ``"covariance"``: when rows far outnumber columns, the ``p x p``
+  covariance is accumulated block by block with
+  :class:`stats_kernel.MomentAccumulator` and eigendecomposed, in
+  ``O(n p^2)`` time and ``O(p^2)`` extra memory.
+- ``"randomized"``: for wide data, a randomized SVD whose rank is doubled
+  until the leading components reach the variance threshold.  The total
+  variance comes from the squared Frobenius norm of the centered data, so
+  the threshold is exact without computing every component.
+- ``"full"``: sklearn's exact SVD, for small or square-ish data.
+
+:func:`fit_pca_chunks` is the out-of-core mode: it accumulates the
+covariance over an iterable of chunks, such as the ``chunks`` returned by
+:func:`aqi_io.stream_scaled_chunks`, so the data never has to fit in memory.
+"""
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.utils.extmath import randomized_svd, svd_flip
+
+from stats_kernel import DEFAULT_CHUNK_ROWS, MomentAccumulator
+
+SOLVERS = ("auto", "full", "covariance", "randomized")
+COVARIANCE_MIN_RATIO = 10
+RANDOMIZED_MIN_FEATURES = 100
+INITIAL_RANK = 16
+N_OVERSAMPLES = 10
+N_POWER_ITER = 4
+# Components computed past the ones returned; the trailing singular vectors of
+# a randomized SVD are the least accurate, so they are computed and dropped
+EXTRA_RANK = 10
+# Beyond this share of the rank a randomized SVD is no cheaper than the full one
+RANDOMIZED_MAX_RANK_FRACTION = 0.25
+
+
+def _n_kept(ratio, n_components):
+    """Return how many components ``n_components`` selects, as sklearn does."""
+    if isinstance(n_components, float) and 0 < n_components < 1:
+        return min(int(np.searchsorted(np.cumsum(ratio), n_components, side="right")) + 1,
+                   len(ratio))
+    return int(n_components)
+
+
+def _fitted_pca(n_components, components, explained_variance, total_variance, n_samples,
+                mean, rank):
+    """Return a ``PCA`` with the fitted attributes set from a partial spectrum.
+
+    ``components`` and ``explained_variance`` hold the leading ``k`` of the
+    ``rank = min(n_samples, n_features)`` components; ``total_variance`` is
+    the variance of all of them.
+    """
+    ratio = explained_variance / total_variance
+    k = min(_n_kept(ratio, n_components), len(ratio))
+    # Same sign convention as sklearn: largest loading of each component positive
+    components = components[:k]
+    signs = np.sign(components[np.arange(k), np.argmax(np.abs(components), axis=1)])
+    signs[signs == 0] = 1.0
+
+    pca = PCA(n_components=n_components)
+    pca.n_components_ = k
+    pca.components_ = components * signs[:, None]
+    pca.explained_variance_ = explained_variance[:k]
+    pca.explained_variance_ratio_ = ratio[:k]
+    pca.singular_values_ = np.sqrt(explained_variance[:k] * max(n_samples - 1, 1))
+    pca.noise_variance_ = ((total_variance - explained_variance[:k].sum()) / (rank - k)
+                           if k < rank else 0.0)
+    pca.mean_ = np.asarray(mean, dtype=np.float64)
+    pca.n_samples_ = n_samples
+    pca.n_features_in_ = len(pca.mean_)
+    return pca
+
+
+def pca_from_covariance(cov, n_samples, n_components, mean=None):
+    """Return a fitted ``PCA`` from the (population) covariance of the data.
+
+    ``n_components`` follows ``sklearn.decomposition.PCA``: an int, or a
+    float in (0, 1) selecting the smallest number of components explaining
+    that share of the variance.  ``mean`` defaults to zero, for data that
+    is already centered.
+    """
+    eigvals, eigvecs = np.linalg.eigh(cov)
+    order = np.argsort(eigvals)[::-1]
+    eigvals = np.clip(eigvals[order], 0, None) * n_samples / max(n_samples - 1, 1)
+    rank = min(n_samples, cov.shape[0])
+    if mean is None:
+        mean = np.zeros(cov.shape[0])
+    return _fitted_pca(n_components, eigvecs[:, order].T[:rank], eigvals[:rank],
+                       eigvals.sum(), n_samples, mean, rank)
+
+
+def _covariance_pca(chunks, n_components):
+    moments = MomentAccumulator()
+    for chunk in chunks:
+        moments.update(chunk)
+    if moments.n == 0:
+        raise ValueError("Cannot fit PCA on empty data")
+    return pca_from_covariance(moments.comoment_ / moments.n, moments.n, n_components,
+                               moments.mean_)
+
+
+def _randomized_pca(X, n_components, random_state):
+    n_samples, n_features = X.shape
+    rank = min(n_samples, n_features)
+    mean = X.mean(axis=0)
+    centered = X - mean
+    total_variance = np.einsum("ij,ij->", centered, centered) / (n_samples - 1)
+    adaptive = isinstance(n_components, float)
+    k = min(INITIAL_RANK if adaptive else int(n_components), rank)
+    while True:
+        U, S, Vt = randomized_svd(centered, min(k + EXTRA_RANK, rank), n_oversamples=N_OVERSAMPLES,
+                                  n_iter=N_POWER_ITER, flip_sign=False,
+                                  random_state=random_state)
+        explained_variance = S[:k] ** 2 / (n_samples - 1)
+        if not adaptive or explained_variance.sum() / total_variance > n_components:
+            break
+        if 2 * k > RANDOMIZED_MAX_RANK_FRACTION * rank:
+            return None
+        k *= 2
+    _, Vt = svd_flip(U[:, :k], Vt[:k], u_based_decision=False)
+    return _fitted_pca(n_components, Vt, explained_variance, total_variance, n_samples,
+                       mean, rank)
+
+
+def select_solver(n_samples, n_features):
+    """Return the solver ``fit_pca(solver="auto")`` uses for this shape."""
+    if n_samples >= COVARIANCE_MIN_RATIO * n_features:
+        return "covariance"
+    if min(n_samples, n_features) >= RANDOMIZED_MIN_FEATURES:
+        return "randomized"
+    return "full"
+
+
+def fit_pca(X, n_components=0.95, solver="auto", random_state=0,
+            chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Return a ``PCA`` fitted to the 2-D array ``X``.
+
+    With the ``"full"`` and ``"covariance"`` solvers the result is
+    interchangeable with ``PCA(n_components).fit(X)``: ``transform`` gives
+    the same scores.  ``"randomized"`` computes ``EXTRA_RANK`` components
+    beyond the ones it returns; it matches to rounding error when the
+    spectrum drops off within them and is an approximation when it decays
+    slowly.  It falls back to the full SVD when the threshold needs more than
+    a quarter of the rank.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}, expected one of {SOLVERS}")
+    X = np.asarray(X, dtype=np.float64)
+    if solver == "auto":
+        solver = select_solver(*X.shape)
+    if solver == "covariance":
+        return _covariance_pca((X[start:start + chunk_rows]
+                                for start in range(0, len(X), chunk_rows)), n_components)
+    if solver == "randomized":
+        pca = _randomized_pca(X, n_components, random_state)
+        if pca is not None:
+            return pca
+    return PCA(n_components=n_components, svd_solver="full").fit(X)
+
+
+def fit_pca_chunks(chunks, n_components=0.95):
+    """Return a ``PCA`` fitted to an iterable of DataFrame or array chunks.
+
+    Only one chunk and the ``p x p`` covariance are held in memory.
+    """
+    return _covariance_pca(chunks, n_components)
@@ -0,0 +1,181 @@
+"""Headless figures for the AQI analysis.
+
+Plotting is off by default so batch runs do not spend their time in
+matplotlib.  Set the ``AQI_PLOT_DIR`` environment variable (or pass
+``out_dir``) to render the figures as PNG files through the Agg backend;
+matplotlib and seaborn are only imported when a figure is actually drawn.
+"""
+
+import os
+
+import numpy as np
+
+PLOT_DIR_ENV = "AQI_PLOT_DIR"
+MAX_HEATMAP_ROWS = 500
+
+
+def plot_dir(out_dir=None):
+    """Return the directory figures go to, or None when plotting is off."""
+    return out_dir if out_dir is not None else os.environ.get(PLOT_DIR_ENV)
+
+
+def plots_enabled(out_dir=None):
+    return plot_dir(out_dir) is not None
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _save(fig, name, out_dir):
+    plt = _pyplot()
+    out_dir = plot_dir(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.png")
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def missing_value_matrix(frame, max_rows=MAX_HEATMAP_ROWS):
+    """Return the missing-value matrix of ``frame`` for a heatmap.
+
+    Frames with more than ``max_rows`` rows are aggregated into
+    ``max_rows`` consecutive row blocks holding the missing count of each
+    column, so the heatmap size does not grow with the data.
+    """
+    missing = frame.isnull()
+    if len(missing) <= max_rows:
+        return missing
+    blocks = np.arange(len(missing)) * max_rows // len(missing)
+    return missing.groupby(blocks).sum()
+
+
+def plot_missing_values(before, after, out_dir=None, max_rows=MAX_HEATMAP_ROWS):
+    """Heatmaps of the missing values before and after filling."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    import seaborn as sns
+
+    fig = plt.figure(figsize=(12, 6))
+    for position, (frame, title) in enumerate(
+            [(before, 'Missing Values Before Filling'), (after, 'Missing Values After Filling')], 1):
+        matrix = missing_value_matrix(frame, max_rows)
+        aggregated = len(matrix) < len(frame)
+        plt.subplot(1, 2, position)
+        # Cell borders only make sense while every row gets its own cell
+        sns.heatmap(matrix, cbar=aggregated, cmap='viridis',
+                    linewidths=0 if aggregated else 0.5, linecolor='grey')
+        plt.title(title, fontsize=16)
+        plt.xticks(fontsize=10)
+        plt.yticks(fontsize=10, rotation=0)
+        plt.tight_layout()
+    return _save(fig, "missing_values_heatmap", out_dir)
+
+
+def plot_missing_counts(missing_before, missing_after, out_dir=None):
+    """Bar plot of the missing-value count of each feature before and after filling."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    fig = plt.figure(figsize=(10, 6))
+    plt.bar(missing_before.index, missing_before.values, color='skyblue', label='Before Filling')
+    plt.bar(missing_after.index, missing_after.values, color='lightgreen', label='After Filling')
+    plt.xlabel('Features')
+    plt.ylabel('Number of Missing Values')
+    plt.title('Distribution of Missing Values Before and After Filling')
+    plt.xticks(rotation=90, ha='right')
+    plt.legend()
+    plt.tight_layout()
+    return _save(fig, "missing_values_counts", out_dir)
+
+
+def plot_vif(vif_table, title, name, color='skyblue', figsize=(8, 5), rotation=90, out_dir=None):
+    """Bar plot of a ``feature``/``VIF`` table."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    fig = plt.figure(figsize=figsize)
+    plt.bar(vif_table["feature"], vif_table["VIF"], color=color)
+    plt.xlabel('Features')
+    plt.ylabel('VIF')
+    plt.title(title)
+    plt.xticks(rotation=rotation)
+    return _save(fig, name, out_dir)
+
+
+def plot_correlation(correlation_matrix, out_dir=None):
+    """Annotated heatmap of a correlation matrix."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    import seaborn as sns
+
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='viridis', fmt=".2f")
+    plt.title('Correlation Heatmap of All Existing Columns', fontsize=16)
+    plt.xticks(rotation=45)
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    return _save(fig, "correlation_heatmap", out_dir)
+
+
+def plot_metric_comparison(labels, before_metrics, after_metrics, out_dir=None):
+    """Grouped bar plot of the metrics before and after dropping columns."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    x = np.arange(len(labels))
+    width = 0.30
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(x - width/2, before_metrics, width, label='Before Dropping Columns', color='skyblue')
+    ax.bar(x + width/2, after_metrics, width, label='After Dropping Columns', color='lightgreen')
+
+    ax.set_ylabel('Metrics')
+    ax.set_title('Comparison of Metrics Before and After Dropping Columns')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels)
+    ax.legend()
+    return _save(fig, "metric_comparison", out_dir)
+
+
+def plot_residuals(y_test, y_pred_linear, y_pred_ridge, out_dir=None):
+    """Side-by-side residual plots for the linear and Ridge models."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    import seaborn as sns
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for ax, y_pred, color, name in [(axes[0], y_pred_linear, "g", "Linear Regression"),
+                                    (axes[1], y_pred_ridge, "b", "Ridge Regression")]:
+        sns.residplot(x=y_pred, y=y_test - y_pred, lowess=True, color=color, ax=ax)
+        ax.axhline(y=0, color='r', linestyle='-')
+        ax.set_title(f"Residual Plot for {name}")
+        ax.set_xlabel("Predicted Values")
+        ax.set_ylabel("Residuals")
+
+    fig.suptitle("Residual Plots for Linear and Ridge Regression", fontsize=22)
+    fig.tight_layout()
+    return _save(fig, "residuals", out_dir)
+
+
+def plot_actual_vs_predicted(y_test, y_pred_linear, y_pred_ridge, out_dir=None):
+    """Scatter plot of actual against predicted values for both models."""
+    if not plots_enabled(out_dir):
+        return None
+    plt = _pyplot()
+    fig = plt.figure(figsize=(8, 6))
+    plt.scatter(y_test, y_pred_linear, color="green", label="Linear")
+    plt.scatter(y_test, y_pred_ridge, color="blue", label="Ridge")
+    plt.plot([min(y_test), max(y_test)], [min(y_test), max(y_test)], linestyle='--', color='r')
+    plt.xlabel("Actual Values")
+    plt.ylabel("Predicted Values")
+    plt.title("Actual vs. Predicted Values for Linear and Ridge Regression")
+    plt.legend()
+    return _save(fig, "actual_vs_predicted", out_dir)
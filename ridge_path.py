@@ -0,0 +1,66 @@
+"""Ridge regularization path from a single SVD.
+
+With the thin SVD ``Xc = U S V^T`` of the centered design matrix, the Ridge
+solution, fitted values and hat-matrix diagonal for any ``alpha`` are
+closed-form in ``S``.  One SVD therefore gives the leave-one-out (LOO) or
+generalized cross-validation (GCV) error of hundreds of alphas, for about
+the cost of a single fit.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from sklearn.linear_model import Ridge
+
+DEFAULT_ALPHAS = np.logspace(-3, 3, 200)
+ALPHA_BLOCK_SIZE = 64
+
+RidgePath = namedtuple("RidgePath", ["alphas", "errors", "coefs", "intercepts", "best_alpha"])
+
+
+def ridge_path(X, y, alphas=DEFAULT_ALPHAS, criterion="loo", block_size=ALPHA_BLOCK_SIZE):
+    """Evaluate Ridge (with an unpenalized intercept) along ``alphas``.
+
+    ``criterion`` is ``"loo"`` for the exact leave-one-out mean squared
+    error or ``"gcv"`` for generalized cross-validation.  Alphas are
+    processed in blocks of ``block_size`` so the ``n x block_size`` work
+    arrays stay bounded.  Returns a ``RidgePath`` with one error, coefficient
+    vector and intercept per alpha, and the alpha with the lowest error.
+    """
+    if criterion not in ("loo", "gcv"):
+        raise ValueError(f"Unknown criterion: {criterion!r}")
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+    n = len(y)
+    x_mean = X.mean(axis=0)
+    y_mean = y.mean()
+    yc = y - y_mean
+    U, s, Vt = np.linalg.svd(X - x_mean, full_matrices=False)
+    Uty = U.T @ yc
+    leverage = U ** 2
+
+    errors = []
+    coefs = []
+    for start in range(0, len(alphas), block_size):
+        block = alphas[start:start + block_size, None]
+        shrink = s ** 2 / (s ** 2 + block)
+        residuals = yc[:, None] - U @ (shrink * Uty).T
+        if criterion == "loo":
+            hat = 1 / n + leverage @ shrink.T
+            errors.append(np.mean((residuals / (1 - hat)) ** 2, axis=0))
+        else:
+            dof = 1 + shrink.sum(axis=1)
+            errors.append(np.mean(residuals ** 2, axis=0) / (1 - dof / n) ** 2)
+        coefs.append((s / (s ** 2 + block) * Uty) @ Vt)
+
+    errors = np.concatenate(errors)
+    coefs = np.concatenate(coefs)
+    intercepts = y_mean - coefs @ x_mean
+    return RidgePath(alphas, errors, coefs, intercepts, float(alphas[np.argmin(errors)]))
+
+
+def fit_tuned_ridge(X, y, alphas=DEFAULT_ALPHAS, criterion="loo"):
+    """Return a ``Ridge`` fitted with the best alpha of :func:`ridge_path`, and the path."""
+    path = ridge_path(X, y, alphas, criterion)
+    return Ridge(alpha=path.best_alpha).fit(X, y), path
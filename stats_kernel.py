@@ -0,0 +1,168 @@
+"""Single-pass mergeable statistics for correlation, scaling and VIF.
+
+``MomentAccumulator`` keeps the row count, column means and the matrix of
+centered co-moments of a stream of chunks.  Each chunk is reduced in
+float64 and folded in with the pairwise update of Chan, Golub and LeVeque,
+so accumulators built on separate chunks, files or workers can be merged
+without losing precision.  Standardization parameters, the correlation
+matrix and every VIF are read off the same accumulator, so the data is
+scanned once instead of once per statistic.
+
+With ``track_missing=True`` the accumulator also tracks the missing-value
+mask next to the values with gaps filled by a reference value ``r`` (the
+mean of the first chunk, which keeps the co-moments well conditioned).
+Median imputation is linear in that pair, ``x = x0 + mask * (median - r)``,
+so the moments of the imputed data follow
+exactly from :meth:`MomentAccumulator.imputed` once the medians are known,
+and the median sketch can be updated in the same pass.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from vif import vif_from_correlation
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+class MomentAccumulator:
+    """Mergeable count, mean and co-moment matrix of a set of columns."""
+
+    def __init__(self, columns=None, track_missing=False):
+        self.columns = None if columns is None else list(columns)
+        self.track_missing = track_missing
+        self.n = 0
+        self.mean_ = None
+        self.comoment_ = None
+        self.reference_ = None
+
+    @classmethod
+    def from_frame(cls, frame, chunk_rows=DEFAULT_CHUNK_ROWS, track_missing=False):
+        """Accumulate the columns of ``frame`` in blocks of ``chunk_rows`` rows."""
+        accumulator = cls(frame.columns, track_missing)
+        for start in range(0, len(frame), chunk_rows):
+            accumulator.update(frame.iloc[start:start + chunk_rows])
+        return accumulator
+
+    def _block(self, chunk):
+        if isinstance(chunk, pd.DataFrame):
+            if self.columns is None:
+                self.columns = list(chunk.columns)
+            chunk = chunk[self.columns]
+        values = np.asarray(chunk, dtype=np.float64)
+        if self.columns is None:
+            # Array chunks are addressed by column position
+            self.columns = list(range(values.shape[1]))
+        missing = np.isnan(values)
+        if self.track_missing:
+            if self.reference_ is None:
+                counts = np.maximum((~missing).sum(axis=0), 1)
+                self.reference_ = np.where(missing, 0.0, values).sum(axis=0) / counts
+            return np.hstack([np.where(missing, self.reference_, values), missing])
+        if missing.any():
+            raise ValueError("Missing values found; impute first or use track_missing=True")
+        return values
+
+    def update(self, chunk):
+        """Fold a DataFrame or 2-D array chunk into the statistics."""
+        block = self._block(chunk)
+        if len(block) == 0:
+            return self
+        mean = block.mean(axis=0)
+        centered = block - mean
+        return self._merge(len(block), mean, centered.T @ centered)
+
+    def _merge(self, n, mean, comoment):
+        if self.n == 0:
+            self.n, self.mean_, self.comoment_ = n, mean, comoment
+            return self
+        total = self.n + n
+        delta = mean - self.mean_
+        self.comoment_ = self.comoment_ + comoment + np.outer(delta, delta) * (self.n * n / total)
+        self.mean_ = self.mean_ + delta * (n / total)
+        self.n = total
+        return self
+
+    def merge(self, other):
+        """Fold the statistics of another accumulator over the same columns."""
+        if other.columns != self.columns or other.track_missing != self.track_missing:
+            raise ValueError("Can only merge accumulators over the same columns")
+        if not other.n:
+            return self
+        mean, comoment = other.mean_, other.comoment_
+        if self.track_missing:
+            if self.reference_ is None:
+                self.reference_ = other.reference_
+            # Re-express the other side's filled values with this reference
+            p = len(self.columns)
+            transform = np.eye(2 * p)
+            transform[p:, :p] = np.diag(self.reference_ - other.reference_)
+            mean, comoment = mean @ transform, transform.T @ comoment @ transform
+        return self._merge(other.n, mean, comoment)
+
+    def imputed(self, medians):
+        """Return the accumulator of the data with missing values set to ``medians``."""
+        if not self.track_missing:
+            return self
+        p = len(self.columns)
+        fill = np.asarray(pd.Series(medians).reindex(self.columns), dtype=np.float64)
+        # [x0, mask] -> x0 + mask * (fill - r) is the linear map A = [I; diag(fill - r)]
+        transform = np.vstack([np.eye(p), np.diag(fill - self.reference_)])
+        result = MomentAccumulator(self.columns)
+        result.n = self.n
+        result.mean_ = self.mean_ @ transform
+        result.comoment_ = transform.T @ self.comoment_ @ transform
+        return result
+
+    def missing_counts(self):
+        """Return the number of missing values per column (``track_missing`` only)."""
+        p = len(self.columns)
+        return pd.Series(np.rint(self.mean_[p:] * self.n).astype(np.int64), index=self.columns)
+
+    def _index(self, columns):
+        if self.track_missing:
+            raise ValueError("Call imputed() before reading statistics")
+        columns = self.columns if columns is None else list(columns)
+        return [self.columns.index(col) for col in columns], columns
+
+    def mean(self, columns=None):
+        index, columns = self._index(columns)
+        return pd.Series(self.mean_[index], index=columns)
+
+    def covariance(self, columns=None, ddof=1):
+        index, columns = self._index(columns)
+        cov = self.comoment_[np.ix_(index, index)] / (self.n - ddof)
+        return pd.DataFrame(cov, index=columns, columns=columns)
+
+    def variance(self, columns=None, ddof=1):
+        index, columns = self._index(columns)
+        return pd.Series(np.diag(self.comoment_)[index] / (self.n - ddof), index=columns)
+
+    def correlation(self, columns=None):
+        """Return the Pearson correlation matrix, as ``DataFrame.corr`` would."""
+        cov = self.covariance(columns, ddof=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = 1 / np.sqrt(np.diag(cov))
+        scale[~np.isfinite(scale)] = np.nan
+        return cov * np.outer(scale, scale)
+
+    def vif(self, columns=None):
+        """Return the ``feature``/``VIF`` table of ``columns``."""
+        corr = self.correlation(columns)
+        return pd.DataFrame({"feature": corr.columns, "VIF": vif_from_correlation(corr.to_numpy())})
+
+    def to_scaler(self, columns=None):
+        """Return a ``StandardScaler`` fitted from the accumulated statistics."""
+        var = self.variance(columns, ddof=0).to_numpy()
+        scale = np.sqrt(var)
+        scale[scale == 0] = 1.0  # as StandardScaler does for constant columns
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean(columns).to_numpy()
+        scaler.var_ = var
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = self.n
+        scaler.n_features_in_ = len(scale)
+        scaler.feature_names_in_ = np.asarray(self.columns if columns is None else list(columns),
+                                              dtype=object)
+        return scaler
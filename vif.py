@@ -0,0 +1,172 @@
+"""Closed-form variance inflation factors.
+
+``statsmodels.variance_inflation_factor`` fits one OLS regression per
+column, so a VIF table costs ``p`` regressions.  The VIF of column ``i`` is
+also the ``i``-th diagonal entry of the inverse correlation matrix, which
+gives every VIF at once from a single Cholesky factorization.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import LinAlgError, cho_factor, cho_solve
+
+SINGULAR_TOL = 1e-10
+DEFAULT_VIF_THRESHOLD = 10.0
+
+VIFElimination = namedtuple("VIFElimination", ["kept", "dropped", "trajectory"])
+
+
+def correlation_matrix(values, centered=True):
+    """Return the correlation matrix of the columns of ``values``.
+
+    With ``centered=False`` the columns are not demeaned, which matches a
+    regression without an intercept.  Constant (or, uncentered, all-zero)
+    columns get NaN rows and columns.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if centered:
+        values = values - values.mean(axis=0)
+    gram = values.T @ values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = 1 / np.sqrt(np.diag(gram))
+    scale[~np.isfinite(scale)] = np.nan
+    return gram * np.outer(scale, scale)
+
+
+def inverse_correlation(corr, tol=SINGULAR_TOL):
+    """Invert a correlation matrix, tolerating singular and degenerate input.
+
+    Returns ``(inverse, singular)`` where ``singular`` flags the columns that
+    are constant or lie in an exact linear dependency.  Their VIF is
+    infinite; the remaining block of ``inverse`` is the pseudo-inverse.
+    """
+    corr = np.asarray(corr, dtype=np.float64)
+    p = corr.shape[0]
+    singular = np.isnan(np.diag(corr))
+    inverse = np.full((p, p), np.nan)
+    valid = np.flatnonzero(~singular)
+    if len(valid) == 0:
+        return inverse, singular
+    block = corr[np.ix_(valid, valid)]
+    try:
+        factor = cho_factor(block)
+    except LinAlgError:
+        factor = None
+    # A squared pivot is 1 - R^2 of a column on the ones before it, so a
+    # vanishing pivot means an exact dependency that rounding let through
+    if factor is not None and np.diag(factor[0]).min() ** 2 > tol:
+        inverse[np.ix_(valid, valid)] = cho_solve(factor, np.eye(len(valid)))
+        return inverse, singular
+    # Not positive definite: find the exact dependencies from the spectrum
+    eigvals, eigvecs = np.linalg.eigh(block)
+    null = eigvals <= tol * eigvals.max()
+    dependent = (eigvecs[:, null] ** 2).sum(axis=1) > tol
+    kept = eigvecs[:, ~null]
+    inverse[np.ix_(valid, valid)] = (kept / eigvals[~null]) @ kept.T
+    singular[valid[dependent]] = True
+    return inverse, singular
+
+
+def vif_from_correlation(corr, tol=SINGULAR_TOL):
+    """Return the VIF of every column of the correlation matrix ``corr``."""
+    inverse, singular = inverse_correlation(corr, tol)
+    vif = np.diag(inverse).copy()
+    vif[singular] = np.inf
+    return vif
+
+
+def eliminate_from_correlation(corr, columns, threshold=DEFAULT_VIF_THRESHOLD, keep=(),
+                               tol=SINGULAR_TOL):
+    """Drop the highest-VIF column of ``corr`` until every VIF is below ``threshold``.
+
+    After each drop the inverse correlation matrix is downdated with the
+    Schur complement of the removed column, an ``O(p^2)`` step, so the whole
+    elimination costs about one ``O(p^3)`` inversion.  Columns in ``keep``,
+    such as the regression target, are never dropped.
+
+    Returns a ``VIFElimination`` with the kept columns, the columns in drop
+    order and a trajectory table holding the VIF of every column at each
+    step (NaN once a column has been dropped).
+    """
+    columns = list(columns)
+    inverse, singular = inverse_correlation(corr, tol)
+    remaining = list(range(len(columns)))
+    dropped = []
+    trajectory = []
+    while True:
+        vif = np.diag(inverse).copy()
+        vif[singular] = np.inf
+        step = dict.fromkeys(columns, np.nan)
+        step.update({columns[i]: v for i, v in zip(remaining, vif)})
+        trajectory.append(step)
+        candidates = np.array([columns[i] not in keep for i in remaining])
+        if len(remaining) < 2 or not candidates.any():
+            break
+        worst = np.flatnonzero(candidates)[np.argmax(vif[candidates])]
+        if vif[worst] < threshold:
+            break
+        dropped.append(columns[remaining.pop(worst)])
+        rest = np.arange(len(vif)) != worst
+        if singular.any():
+            # The pseudo-inverse cannot be downdated, so refactor the rest
+            inverse, singular = inverse_correlation(corr[np.ix_(remaining, remaining)], tol)
+        else:
+            column = inverse[rest, worst]
+            inverse = inverse[np.ix_(rest, rest)] - np.outer(column, column) / inverse[worst, worst]
+            singular = singular[rest]
+    trajectory = pd.DataFrame(trajectory, columns=columns)
+    trajectory.insert(0, "dropped", [None] + dropped[:len(trajectory) - 1])
+    trajectory.index.name = "step"
+    return VIFElimination([columns[i] for i in remaining], dropped, trajectory)
+
+
+def compute_vif(frame, centered=True):
+    """Return a ``feature``/``VIF`` table for the columns of ``frame``."""
+    vif = vif_from_correlation(correlation_matrix(frame.to_numpy(), centered))
+    return pd.DataFrame({"feature": frame.columns, "VIF": vif})
+
+
+class VIFEngine:
+    """VIF tables for any subset of the columns of one DataFrame.
+
+    The correlation matrix is computed once; the VIFs of a column subset
+    come from the matching sub-matrix and are cached by column set, so
+    dropping columns and recomputing does not touch the data again.
+    """
+
+    def __init__(self, frame, centered=True):
+        self.columns = list(frame.columns)
+        self.corr = correlation_matrix(frame.to_numpy(), centered)
+        self._cache = {}
+
+    @classmethod
+    def from_correlation(cls, corr):
+        """Build an engine from a precomputed correlation DataFrame."""
+        engine = cls.__new__(cls)
+        engine.columns = list(corr.columns)
+        engine.corr = np.asarray(corr, dtype=np.float64)
+        engine._cache = {}
+        return engine
+
+    def vif(self, columns=None):
+        """Return the VIF table for ``columns`` (default: all columns)."""
+        columns = tuple(self.columns if columns is None else columns)
+        if columns not in self._cache:
+            index = [self.columns.index(col) for col in columns]
+            vif = vif_from_correlation(self.corr[np.ix_(index, index)])
+            self._cache[columns] = pd.DataFrame({"feature": list(columns), "VIF": vif})
+        return self._cache[columns].copy()
+
+    def eliminate(self, threshold=DEFAULT_VIF_THRESHOLD, keep=(), columns=None):
+        """Iteratively drop high-VIF columns; see :func:`eliminate_from_correlation`."""
+        columns = self.columns if columns is None else list(columns)
+        index = [self.columns.index(col) for col in columns]
+        return eliminate_from_correlation(self.corr[np.ix_(index, index)], columns,
+                                          threshold, keep)
+
+
+def eliminate_high_vif(frame, threshold=DEFAULT_VIF_THRESHOLD, keep=(), centered=True):
+    """Iteratively drop the highest-VIF column of ``frame`` until all are below ``threshold``."""
+    return VIFEngine(frame, centered).eliminate(threshold, keep)